@@ -1,47 +1,285 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
-from pydantic import BaseModel
-from quotes import QuotesGenerator
-import google.generativeai as genai
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from quotes import QuotesGenerator, normalize_subject
+from fallback_corpus import DEFAULT_CORPUS_PATH, FallbackCorpus
+from assets import AssetBundle
+from warmer import CacheWarmer, load_seed_subjects
+from voices import VOICES_ETAG, VOICES_JSON, is_valid_voice
+from settings_store import DEFAULT_SETTINGS, SettingsStore
+from quote_cache import QuoteCache
+from tts_cache import TTSCache, make_cache_key
+from tts_chunks import split_text, strip_id3
+from upstream import BoundedExecutor
+from singleflight import SingleFlight, StreamFlight
+from coordination import CoordinatedSingleFlight, create_leases
+from clients import ClientPool
+from ratelimit import ClientRateLimiter, Overloaded, UpstreamBudget, retry_after_header
+from resilience import CLOSED, CircuitBreaker, Deadline, RetryPolicy, call_with_retry_async
+from metrics import FALLBACKS, QUOTES_STREAM_FIRST_QUOTE, REGISTRY, MetricsMiddleware, stage
+from logging_config import configure_logging
 from google.cloud import texttospeech
+from contextlib import asynccontextmanager
 import tempfile
 import base64
-from typing import List, Dict
+from typing import Deque, List, Dict, Optional, Set, Tuple
+from collections import deque
 import config
 import os
+import re
+import secrets
+import asyncio
+import json
+import logging
+import time
 
-app = FastAPI(title="Quotes Reading App")
+configure_logging()
+logger = logging.getLogger(__name__)
 
-# Mount static files
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create long-lived upstream clients at startup and release them on shutdown
+    """
+    # Configures Gemini once for the process
+    get_quotes_generator()
+    await tts_client_pool.start()
+    health_check_task = asyncio.create_task(
+        tts_client_pool.run_health_checks(float(os.getenv("CLIENT_HEALTH_CHECK_SECONDS", "60")))
+    )
+    warmer_task = asyncio.create_task(cache_warmer.run()) if WARM_ENABLED else None
+    rescan_task = asyncio.create_task(rescan_tts_cache(TTS_CACHE_SCAN_SECONDS))
+    
+    yield
+    
+    health_check_task.cancel()
+    rescan_task.cancel()
+    if warmer_task is not None:
+        warmer_task.cancel()
+    for task in list(background_tasks):
+        task.cancel()
+    tts_client_pool.close()
+    upstream_executor.shutdown()
+    disk_executor.shutdown()
+    quote_cache.close()
+    settings_store.close()
+    if coordination_leases is not None:
+        coordination_executor.shutdown()
+        coordination_leases.close()
+
+app = FastAPI(title="Quotes Reading App", lifespan=lifespan)
+
+# Per-route latency, response size and in-flight metrics, served on /metrics
+app.add_middleware(MetricsMiddleware, routes_provider=lambda: app.routes)
+
+# Mount static files; pages and fingerprinted CSS/JS are served from asset_bundle
 app.mount("/static", StaticFiles(directory="static"), name="static")
+asset_bundle = AssetBundle("static")
 
-# Initialize quotes generator (will be created on first use)
+# Initialize quotes generator (created at startup by the lifespan handler)
 quotes_generator = None
 
+# Synthesized audio cache, keyed on (text, voice, model, prompt)
+tts_cache = TTSCache(
+    cache_dir=os.getenv("TTS_CACHE_DIR", ".cache/tts"),
+    max_memory_bytes=int(os.getenv("TTS_CACHE_MEMORY_MB", "32")) * 1024 * 1024,
+    max_disk_bytes=int(os.getenv("TTS_CACHE_DISK_MB", "512")) * 1024 * 1024,
+)
+# Workers sharing the audio directory each rescan it, so together they stay within TTS_CACHE_DISK_MB
+TTS_CACHE_SCAN_SECONDS = float(os.getenv("TTS_CACHE_SCAN_SECONDS", "60"))
+# Audio cache files and the SQLite quote cache and settings databases are read and
+# written here instead of on the event loop. The databases are shared by every worker,
+# so a query can wait up to the busy timeout for another worker's write lock.
+disk_executor = BoundedExecutor(max_concurrency=4, name="disk")
+AUDIO_ID_PATTERN = re.compile(r"[0-9a-f]{64}")
+# Audio is content-addressed, so a URL naming its voice never changes
+AUDIO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Blocking Gemini and Cloud TTS client calls run here instead of on the event loop
+upstream_executor = BoundedExecutor(max_concurrency=int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "16")))
+
+# Cloud TTS clients are created once at startup and reused across requests.
+# Each call holds a client exclusively, so the pool matches upstream concurrency by default.
+tts_client_pool = ClientPool(
+    texttospeech.TextToSpeechClient,
+    upstream_executor,
+    size=int(os.getenv("TTS_CLIENT_POOL_SIZE", str(upstream_executor.max_concurrency))),
+)
+
+# Generated quote results, keyed on the normalized subject
+quote_cache = QuoteCache(
+    db_path=os.getenv("QUOTE_CACHE_PATH", ".cache/quotes.sqlite3"),
+    ttl_seconds=float(os.getenv("QUOTE_CACHE_TTL_SECONDS", str(24 * 3600))),
+    stale_seconds=float(os.getenv("QUOTE_CACHE_STALE_SECONDS", str(7 * 24 * 3600))),
+)
+
+# Per-user settings, keyed on an opaque id kept in the USER_COOKIE cookie
+settings_store = SettingsStore(
+    db_path=os.getenv("SETTINGS_DB_PATH", "data/settings.sqlite3"),
+    cache_size=int(os.getenv("SETTINGS_CACHE_SIZE", "10000")),
+)
+USER_COOKIE = "voice_user"
+USER_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{16,64}")
+
+# Bounds on audio prefetching and /api/tts/batch fan-out
+TTS_PREFETCH_CONCURRENCY = int(os.getenv("TTS_PREFETCH_CONCURRENCY", "5"))
+TTS_BATCH_MAX_TEXTS = int(os.getenv("TTS_BATCH_MAX_TEXTS", "50"))
+# Subjects per /api/admin/quote-cache/warm request, each one a Gemini generation
+QUOTE_CACHE_WARM_MAX_SUBJECTS = int(os.getenv("QUOTE_CACHE_WARM_MAX_SUBJECTS", "100"))
+prefetch_semaphore: Optional[asyncio.Semaphore] = None
+
+# Long texts on /api/tts/stream are synthesized in sentence chunks, a few at a time
+TTS_CHUNK_MAX_CHARS = int(os.getenv("TTS_CHUNK_MAX_CHARS", "400"))
+TTS_CHUNK_CONCURRENCY = int(os.getenv("TTS_CHUNK_CONCURRENCY", "3"))
+TTS_STREAM_MAX_CHARS = int(os.getenv("TTS_STREAM_MAX_CHARS", "20000"))
+
+# Concurrent identical quote/TTS requests share a single upstream call. In multi-worker
+# deployments COORDINATION_BACKEND extends this across workers with leases on the key.
+coordination_leases = create_leases(
+    os.getenv("COORDINATION_BACKEND", "none"),
+    db_path=os.getenv("COORDINATION_DB_PATH", ".cache/leases.sqlite3"),
+    redis_url=os.getenv("REDIS_URL"),
+)
+if coordination_leases is None:
+    quote_flights = SingleFlight()
+    tts_flights = SingleFlight()
+else:
+    COORDINATION_LEASE_SECONDS = float(os.getenv("COORDINATION_LEASE_SECONDS", "30"))
+    # Lease calls get their own threads so they never queue behind slow upstream calls
+    coordination_executor = BoundedExecutor(max_concurrency=4, name="coordination")
+    quote_flights = CoordinatedSingleFlight(
+        "quotes", coordination_leases, lambda key: fresh_cached_quotes(key), coordination_executor,
+        COORDINATION_LEASE_SECONDS)
+    tts_flights = CoordinatedSingleFlight(
+        "tts", coordination_leases, lambda key: tts_cache.get(key, count=False), coordination_executor,
+        COORDINATION_LEASE_SECONDS)
+# Concurrent /api/quotes/stream requests for the same subject follow one Gemini stream
+quote_streams = StreamFlight()
+
+# Admission control: per-client token buckets in front of the upstream-backed endpoints,
+# and a concurrency budget per upstream with a bounded wait queue
+rate_limiter = ClientRateLimiter(
+    rate=float(os.getenv("RATE_LIMIT_PER_SECOND", "5")),
+    burst=float(os.getenv("RATE_LIMIT_BURST", "20")),
+)
+gemini_budget = UpstreamBudget(
+    "gemini",
+    max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("GEMINI_MAX_QUEUE", "32")),
+)
+tts_budget = UpstreamBudget(
+    "cloud_tts",
+    max_concurrency=int(os.getenv("TTS_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("TTS_MAX_QUEUE", "32")),
+)
+
+# Request-level deadlines, retries of transient failures and a circuit breaker per upstream
+QUOTES_DEADLINE_SECONDS = float(os.getenv("QUOTES_DEADLINE_SECONDS", "20"))
+TTS_DEADLINE_SECONDS = float(os.getenv("TTS_DEADLINE_SECONDS", "15"))
+retry_policy = RetryPolicy(
+    attempts=int(os.getenv("UPSTREAM_RETRY_ATTEMPTS", "3")),
+    attempt_timeout=float(os.getenv("UPSTREAM_ATTEMPT_TIMEOUT_SECONDS", "10")),
+)
+gemini_breaker = CircuitBreaker(
+    "gemini",
+    failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+    reset_timeout=float(os.getenv("CIRCUIT_RESET_SECONDS", "30")),
+)
+tts_breaker = CircuitBreaker(
+    "cloud_tts",
+    failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+    reset_timeout=float(os.getenv("CIRCUIT_RESET_SECONDS", "30")),
+)
+
+# Subjects currently being regenerated in the background, and the tasks doing it
+refreshing_subjects: Set[str] = set()
+background_tasks: Set[asyncio.Task] = set()
+
 def get_quotes_generator():
     """Get or create the quotes generator instance"""
     global quotes_generator
     if quotes_generator is None:
-        quotes_generator = QuotesGenerator(config.GEMINI_API_KEY)
+        quotes_generator = QuotesGenerator(
+            config.GEMINI_API_KEY,
+            single_call=os.getenv("QUOTES_SINGLE_CALL", "1") != "0",
+            breaker=gemini_breaker,
+            retry_policy=retry_policy,
+            deadline_seconds=QUOTES_DEADLINE_SECONDS,
+            fallback_corpus=FallbackCorpus.load(os.getenv("FALLBACK_CORPUS_PATH", DEFAULT_CORPUS_PATH)),
+        )
     return quotes_generator
 
+DEFAULT_VOICE_ID = "Aoede"
+DEFAULT_TTS_MODEL = "gemini-2.5-flash-preview-tts"
+
+def upstreams_idle() -> bool:
+    """
+    Whether Gemini and Cloud TTS have spare capacity for background work
+    """
+    for budget, breaker in ((gemini_budget, gemini_breaker), (tts_budget, tts_breaker)):
+        load = budget.stats()
+        if breaker.state != CLOSED or load["in_flight"] + load["queued"] >= load["max_concurrency"] * WARM_IDLE_FRACTION:
+            return False
+    return True
+
+def fresh_cached_quotes(subject: str) -> Optional[Dict[str, any]]:
+    cached = quote_cache.get(subject, count=False)
+    return cached[0] if cached is not None and cached[1] else None
+
+# Background warming of quotes and audio for trending subjects
+WARM_ENABLED = os.getenv("WARM_ENABLED", "1") != "0"
+WARM_IDLE_FRACTION = float(os.getenv("WARM_IDLE_FRACTION", "0.5"))
+cache_warmer = CacheWarmer(
+    lookup=lambda subject: disk_executor.run(fresh_cached_quotes, subject),
+    generate=lambda subject: generate_and_cache_quotes(subject),
+    audio_cached=lambda text, voice_id: disk_executor.run(
+        tts_cache.contains, make_cache_key(text, voice_id, DEFAULT_TTS_MODEL, "")),
+    synthesize=lambda text, voice_id: synthesize_speech_bytes(text, voice_id, DEFAULT_TTS_MODEL, ""),
+    is_idle=upstreams_idle,
+    default_voice=DEFAULT_VOICE_ID,
+    top_k=int(os.getenv("WARM_TOP_K", "20")),
+    interval=float(os.getenv("WARM_INTERVAL_SECONDS", "60")),
+    sketch_size=int(os.getenv("WARM_SKETCH_SIZE", "500")),
+    calls_per_minute=float(os.getenv("WARM_CALLS_PER_MINUTE", "30")),
+    burst=float(os.getenv("WARM_CALLS_BURST", "60")),
+    concurrency=int(os.getenv("WARM_CONCURRENCY", "2")),
+    seed_subjects=load_seed_subjects(os.environ["WARM_SEED_FILE"]) if os.getenv("WARM_SEED_FILE") else (),
+)
+
 class QuoteRequest(BaseModel):
     subject: str
+    prefetch_audio: bool = False  # Start synthesizing every quote in the background
+    voice_id: Optional[str] = None  # Voice used when prefetching audio; defaults to the user's saved voice
 
 class QuoteResponse(BaseModel):
     quotes: List[Dict[str, str]]
     is_person: bool
+    audio_urls: Optional[List[str]] = None  # One per quote when prefetch_audio is set
 
 class TTSRequest(BaseModel):
     text: str
-    voice_id: str = "Aoede"  # Default voice
-    model_name: str = "gemini-2.5-flash-preview-tts"  # Default model
+    voice_id: str = DEFAULT_VOICE_ID  # Default voice
+    model_name: str = DEFAULT_TTS_MODEL  # Default model
     prompt: str = ""  # Optional style prompt
 
 class TTSResponse(BaseModel):
     audio_data: str  # Base64 encoded audio
 
+class TTSBatchRequest(BaseModel):
+    texts: List[str]
+    voice_id: str = DEFAULT_VOICE_ID
+    model_name: str = DEFAULT_TTS_MODEL
+    prompt: str = ""
+
+class TTSBatchItem(BaseModel):
+    audio_id: str
+    audio_url: str
+    status: str  # "ready", or "USE_BROWSER_TTS" if synthesis failed
+
+class TTSBatchResponse(BaseModel):
+    items: List[TTSBatchItem]
+
 class VoiceOption(BaseModel):
     id: str
     name: str
@@ -51,56 +289,351 @@ class VoiceOption(BaseModel):
 class VoicesResponse(BaseModel):
     voices: List[VoiceOption]
 
+class QuoteCacheWarmRequest(BaseModel):
+    subjects: List[str] = Field(max_length=QUOTE_CACHE_WARM_MAX_SUBJECTS)
+
+class QuoteCachePurgeResponse(BaseModel):
+    purged: int
+
+class QuoteCacheWarmResponse(BaseModel):
+    scheduled: int
+
+class BudgetLimits(BaseModel):
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+    max_queue: Optional[int] = Field(default=None, ge=0)
+
+class LimitsUpdate(BaseModel):
+    rate_limit_per_second: Optional[float] = Field(default=None, ge=0)  # 0 disables rate limiting
+    rate_limit_burst: Optional[float] = Field(default=None, ge=1)
+    gemini: Optional[BudgetLimits] = None
+    cloud_tts: Optional[BudgetLimits] = None
+
 class SettingsRequest(BaseModel):
-    voice_id: str
+    voice_id: Optional[str] = None
+    sound_effects: Optional[bool] = None
+    auto_tts: Optional[bool] = None
+
+class UserSettings(BaseModel):
+    voice_id: Optional[str]
+    sound_effects: bool
+    auto_tts: bool
 
 class SettingsResponse(BaseModel):
     success: bool
     message: str
 
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """
+    Rejected by admission control: tell the client when to come back
+    """
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": retry_after_header(exc.retry_after)},
+    )
+
+def enforce_rate_limit(request: Request):
+    """
+    Per-client token bucket for endpoints that can reach an upstream
+    """
+    rate_limiter.check(request.client.host if request.client else "unknown")
+
+def serve_page(route: str, request: Request) -> Response:
+    return asset_bundle.page(route).response(request.headers.get("accept-encoding"), request.headers.get("if-none-match"))
+
 @app.get("/", response_class=HTMLResponse)
-async def read_root():
+async def read_root(request: Request):
     """Serve the home page"""
-    return FileResponse("static/home.html")
+    return serve_page("/", request)
 
 @app.get("/quotes", response_class=HTMLResponse)
-async def read_quotes():
+async def read_quotes(request: Request):
     """Serve the quotes page"""
-    return FileResponse("static/quotes.html")
+    return serve_page("/quotes", request)
 
 @app.get("/settings", response_class=HTMLResponse)
-async def read_settings():
+async def read_settings(request: Request):
     """Serve the settings page"""
-    return FileResponse("static/settings.html")
+    return serve_page("/settings", request)
 
-@app.post("/api/quotes", response_model=QuoteResponse)
-async def get_quotes(request: QuoteRequest):
+@app.get("/assets/{name}")
+async def read_asset(name: str, request: Request):
+    """Serve a fingerprinted, minified CSS/JS bundle"""
+    asset = asset_bundle.asset(name)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    return asset.response(request.headers.get("accept-encoding"), request.headers.get("if-none-match"))
+
+@app.post("/api/quotes", response_model=QuoteResponse, dependencies=[Depends(enforce_rate_limit)])
+async def get_quotes(request: QuoteRequest, http_request: Request):
     """
     Generate quotes for a given subject using Gemini 2.5 Flash Lite
     """
+    require_valid_voice(request.voice_id)
     try:
         if not request.subject.strip():
             raise HTTPException(status_code=400, detail="Subject cannot be empty")
         
-        generator = get_quotes_generator()
-        result = generator.generate_quotes(request.subject.strip())
-        return QuoteResponse(quotes=result["quotes"], is_person=result["is_person"])
+        result = await fetch_quotes(request.subject.strip())
+        
+        voice_id = await resolve_voice_id(http_request, request.voice_id)
+        cache_warmer.record(request.subject.strip(), voice_id)
+        
+        audio_urls = None
+        if request.prefetch_audio:
+            audio_urls = [
+                start_speech_prefetch(quote["quote"], voice_id, DEFAULT_TTS_MODEL, "")
+                for quote in result["quotes"]
+            ]
+        
+        return QuoteResponse(quotes=result["quotes"], is_person=result["is_person"], audio_urls=audio_urls)
     
+    except Overloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating quotes: {str(e)}")
 
-@app.post("/api/tts", response_model=TTSResponse)
+@app.get("/api/quotes/stream", dependencies=[Depends(enforce_rate_limit)])
+async def stream_quotes(request: Request, subject: str, prefetch_audio: bool = False, voice_id: Optional[str] = None):
+    """
+    Stream quotes as newline-delimited JSON, one event per line, as Gemini produces them:
+    {"type": "meta", "is_person": ...}, then one {"type": "quote", ...} per quote, then {"type": "done"}
+    (or {"type": "error", "detail": ...} if generation could not start)
+    """
+    subject = subject.strip()
+    if not subject:
+        raise HTTPException(status_code=400, detail="Subject cannot be empty")
+    require_valid_voice(voice_id)
+    voice_id = await resolve_voice_id(request, voice_id)
+    cache_warmer.record(subject, voice_id)
+    
+    def with_audio(event: Dict[str, any]) -> Dict[str, any]:
+        if prefetch_audio and event["type"] == "quote":
+            event["audio_url"] = start_speech_prefetch(event["quote"], voice_id, DEFAULT_TTS_MODEL, "")
+        return event
+    
+    started = time.perf_counter()
+    
+    def with_timing(event: Dict[str, any]) -> Dict[str, any]:
+        nonlocal started
+        if started is not None and event["type"] == "quote":
+            QUOTES_STREAM_FIRST_QUOTE.observe(time.perf_counter() - started)
+            started = None
+        return with_audio(event)
+    
+    async def cached_events(result: Dict[str, any]):
+        yield json.dumps({"type": "meta", "is_person": result["is_person"]}) + "\n"
+        for quote in result["quotes"]:
+            yield json.dumps(with_timing({"type": "quote", **quote})) + "\n"
+        yield json.dumps({"type": "done", "is_fallback": False}) + "\n"
+    
+    async def followed_events(stream):
+        async for event in stream:
+            # Events are shared with the other requests following the same stream
+            yield json.dumps(with_timing(dict(event))) + "\n"
+    
+    with stage("quote_cache_lookup"):
+        cached = await disk_executor.run(quote_cache.get, subject)
+    if cached is not None:
+        result, is_fresh = cached
+        if not is_fresh:
+            schedule_quote_refresh(subject)
+        body = cached_events(result)
+    else:
+        key = normalize_subject(subject)
+        stream = quote_streams.join(key)
+        if stream is None:
+            # Taken before the response starts so an overload is still a proper 503
+            deadline = Deadline(QUOTES_DEADLINE_SECONDS)
+            await gemini_budget.acquire()
+            # Another request may have started the stream while this one waited for a slot
+            stream = quote_streams.join(key)
+            if stream is None:
+                stream = quote_streams.start(key, generate_and_cache_stream(subject, deadline))
+            else:
+                gemini_budget.release()
+        body = followed_events(stream)
+    
+    return StreamingResponse(body, media_type="application/x-ndjson", headers={"Cache-Control": "no-store"})
+
+async def generate_and_cache_stream(subject: str, deadline: Deadline):
+    """
+    Stream quotes from Gemini and cache the complete result; runs in a held
+    gemini_budget slot and releases it when the stream ends
+    """
+    quotes = []
+    is_person = False
+    try:
+        async for event in stream_generated_quotes(subject, deadline):
+            if event["type"] == "meta":
+                is_person = event["is_person"]
+            elif event["type"] == "quote":
+                quotes.append({"quote": event["quote"], "context": event["context"]})
+            elif event["type"] == "done" and event.get("complete", True):
+                await disk_executor.run(
+                    quote_cache.put, subject, {"quotes": quotes, "is_person": is_person, "is_fallback": event["is_fallback"]})
+            yield event
+    finally:
+        gemini_budget.release()
+
+async def stream_generated_quotes(subject: str, deadline: Optional[Deadline] = None):
+    """
+    Drive the blocking Gemini stream on the upstream executor and yield its events on the loop
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+    
+    def produce():
+        try:
+            for event in get_quotes_generator().stream_quotes(subject, deadline):
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, {"type": "error", "detail": f"Error generating quotes: {str(e)}"})
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, finished)
+    
+    producer = asyncio.ensure_future(upstream_executor.run(produce))
+    while True:
+        event = await queue.get()
+        if event is finished:
+            break
+        yield event
+
+async def fetch_quotes(subject: str) -> Dict[str, any]:
+    """
+    Serve quotes from the cache when possible. Stale entries are returned
+    immediately and regenerated in the background.
+    """
+    with stage("quote_cache_lookup"):
+        cached = await disk_executor.run(quote_cache.get, subject)
+    if cached is not None:
+        result, is_fresh = cached
+        if not is_fresh:
+            schedule_quote_refresh(subject)
+        return result
+    
+    return await generate_and_cache_quotes(subject)
+
+async def generate_and_cache_quotes(subject: str) -> Dict[str, any]:
+    """
+    Generate quotes upstream and cache them unless they are fallback quotes.
+    Concurrent calls for the same normalized subject share one upstream call.
+    """
+    return await quote_flights.do(
+        normalize_subject(subject),
+        lambda: generate_and_cache_quotes_uncoalesced(subject)
+    )
+
+async def generate_and_cache_quotes_uncoalesced(subject: str) -> Dict[str, any]:
+    generator = get_quotes_generator()
+    # Time spent queueing for a slot counts against the deadline
+    deadline = Deadline(QUOTES_DEADLINE_SECONDS)
+    async with gemini_budget.slot():
+        result = await upstream_executor.run(generator.generate_quotes, subject, deadline)
+    await disk_executor.run(quote_cache.put, subject, result)
+    return result
+
+def schedule_quote_refresh(subject: str) -> bool:
+    """
+    Regenerate a subject in the background unless a refresh is already running
+    """
+    key = normalize_subject(subject)
+    if key in refreshing_subjects:
+        return False
+    refreshing_subjects.add(key)
+    
+    async def refresh():
+        try:
+            await generate_and_cache_quotes(subject)
+        except Exception as e:
+            logger.warning("Background quote refresh failed", extra={"error": str(e)})
+        finally:
+            refreshing_subjects.discard(key)
+    
+    task = asyncio.create_task(refresh())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return True
+
+async def rescan_tts_cache(interval_seconds: float):
+    """
+    Rescan the audio cache directory every interval_seconds until cancelled
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            evicted = await disk_executor.run(tts_cache.rescan)
+            if evicted:
+                logger.info("Evicted audio over the disk limit", extra={"evicted": evicted})
+        except Exception as e:
+            logger.warning("TTS cache rescan failed", extra={"error": str(e)})
+
+def require_admin(request: Request):
+    """
+    Reject admin calls without the configured ADMIN_TOKEN; with no token configured
+    the admin endpoints are disabled
+    """
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(request.headers.get("x-admin-token", "").encode(), admin_token.encode()):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@app.delete("/api/admin/quote-cache", response_model=QuoteCachePurgeResponse)
+async def purge_quote_cache(request: Request, subject: Optional[str] = None):
+    """
+    Purge one subject from the quote cache, or everything when no subject is given
+    """
+    require_admin(request)
+    return QuoteCachePurgeResponse(purged=await disk_executor.run(quote_cache.purge, subject))
+
+@app.get("/api/admin/limits")
+async def get_limits(request: Request):
+    """
+    Current rate limit and upstream budgets, with their counters
+    """
+    require_admin(request)
+    return {
+        "rate_limiter": rate_limiter.stats(),
+        "gemini": gemini_budget.stats(),
+        "cloud_tts": tts_budget.stats(),
+    }
+
+@app.put("/api/admin/limits")
+async def update_limits(request: Request, limits: LimitsUpdate):
+    """
+    Change the rate limit and upstream budgets without a restart; omitted fields are left as they are
+    """
+    require_admin(request)
+    rate_limiter.configure(rate=limits.rate_limit_per_second, burst=limits.rate_limit_burst)
+    for budget, budget_limits in ((gemini_budget, limits.gemini), (tts_budget, limits.cloud_tts)):
+        if budget_limits is not None:
+            budget.configure(max_concurrency=budget_limits.max_concurrency, max_queue=budget_limits.max_queue)
+    logger.info("Admission limits updated", extra={"limits": limits.model_dump(exclude_none=True)})
+    return await get_limits(request)
+
+@app.post("/api/admin/quote-cache/warm", response_model=QuoteCacheWarmResponse)
+async def warm_quote_cache(request: Request, warm_request: QuoteCacheWarmRequest):
+    """
+    Generate and cache quotes for the given subjects in the background
+    """
+    require_admin(request)
+    subjects = {normalize_subject(subject): subject.strip() for subject in warm_request.subjects if subject.strip()}
+    scheduled = sum(1 for subject in subjects.values() if schedule_quote_refresh(subject))
+    return QuoteCacheWarmResponse(scheduled=scheduled)
+
+@app.post("/api/tts", response_model=TTSResponse, dependencies=[Depends(enforce_rate_limit)])
 async def text_to_speech(request: TTSRequest):
     """
     Convert text to speech using Gemini 2.5 Flash Preview TTS
     """
+    require_valid_voice(request.voice_id)
     try:
         if not request.text.strip():
             raise HTTPException(status_code=400, detail="Text cannot be empty")
         
-        # Configure Gemini for TTS
-        genai.configure(api_key=config.GEMINI_API_KEY)
-        
         # Generate speech using Gemini TTS with selected voice
         audio_data = await generate_speech_with_gemini(
             text=request.text, 
@@ -111,119 +644,486 @@ async def text_to_speech(request: TTSRequest):
         
         return TTSResponse(audio_data=audio_data)
     
+    except Overloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating speech: {str(e)}")
 
-async def generate_speech_with_gemini(text: str, voice_id: str = "Aoede", model_name: str = "gemini-2.5-flash-preview-tts", prompt: str = "") -> str:
+async def generate_speech_with_gemini(text: str, voice_id: str = DEFAULT_VOICE_ID, model_name: str = DEFAULT_TTS_MODEL, prompt: str = "") -> str:
     """
     Generate speech using Gemini TTS with specified voice via Google Cloud Text-to-Speech API
     """
     try:
-        # Log the voice selection for debugging
-        print(f"Attempting Gemini TTS with voice: {voice_id}, model: {model_name} for text: '{text[:50]}...'")
-        
-        # Initialize Google Cloud Text-to-Speech client
-        client = texttospeech.TextToSpeechClient()
-        
-        # Create synthesis input with optional prompt
-        synthesis_input = texttospeech.SynthesisInput(
-            text=text,
-            prompt=prompt if prompt else f"Say the following in a natural, clear voice"
-        )
-        
-        # Select the voice
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="en-US",
-            name=voice_id,
-            model_name=model_name
-        )
-        
-        # Configure audio output
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3
-        )
-        
-        # Perform the text-to-speech request
-        response = client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice, 
-            audio_config=audio_config
-        )
+        audio_content = await synthesize_speech_bytes(text, voice_id, model_name, prompt)
         
         # Encode audio as base64 data URL
-        audio_base64 = base64.b64encode(response.audio_content).decode('utf-8')
-        audio_data_url = f"data:audio/mp3;base64,{audio_base64}"
-        
-        print(f"Successfully generated speech with Gemini TTS voice: {voice_id}")
-        return audio_data_url
+        with stage("base64_encode"):
+            audio_base64 = base64.b64encode(audio_content).decode('utf-8')
+            return f"data:audio/mp3;base64,{audio_base64}"
         
+    except Overloaded:
+        # Shed load is reported to the client rather than hidden behind browser TTS
+        raise
     except Exception as e:
-        print(f"Gemini TTS error: {e}")
-        print(f"Falling back to browser TTS with voice preference: {voice_id}")
+        logger.warning("Gemini TTS error, falling back to browser TTS", extra={"voice_id": voice_id, "error": str(e)})
+        FALLBACKS.inc(kind="browser_tts")
         return "USE_BROWSER_TTS"
 
+async def synthesize_speech_bytes(text: str, voice_id: str = DEFAULT_VOICE_ID, model_name: str = DEFAULT_TTS_MODEL, prompt: str = "") -> bytes:
+    """
+    Return MP3 audio for the given text, serving repeats from the TTS cache.
+    Raises if the upstream synthesis fails; failures are never cached.
+    """
+    cache_key = make_cache_key(text, voice_id, model_name, prompt)
+    with stage("tts_cache_lookup"):
+        cached = await cached_speech(cache_key)
+    if cached is not None:
+        return cached
+    
+    return await tts_flights.do(
+        cache_key,
+        lambda: synthesize_and_cache_speech(cache_key, text, voice_id, model_name, prompt)
+    )
+
+async def synthesize_and_cache_speech(cache_key: str, text: str, voice_id: str, model_name: str, prompt: str) -> bytes:
+    """
+    Call Cloud TTS and store the result under cache_key
+    """
+    logger.debug("Synthesizing speech", extra={"voice_id": voice_id, "model_name": model_name, "chars": len(text)})
+    
+    # Create synthesis input with optional prompt
+    synthesis_input = texttospeech.SynthesisInput(
+        text=text,
+        prompt=prompt if prompt else f"Say the following in a natural, clear voice"
+    )
+    
+    # Select the voice
+    voice = texttospeech.VoiceSelectionParams(
+        language_code="en-US",
+        name=voice_id,
+        model_name=model_name
+    )
+    
+    # Configure audio output
+    audio_config = texttospeech.AudioConfig(
+        audio_encoding=texttospeech.AudioEncoding.MP3
+    )
+    
+    # Perform the text-to-speech request on a pooled client; the client library's own
+    # retries are disabled so attempts and timeouts all come from the request deadline
+    async def attempt(timeout: float):
+        async with tts_client_pool.acquire() as client:
+            return await upstream_executor.run(
+                client.synthesize_speech,
+                input=synthesis_input,
+                voice=voice, 
+                audio_config=audio_config,
+                retry=None,
+                timeout=timeout
+            )
+    
+    deadline = Deadline(TTS_DEADLINE_SECONDS)
+    with stage("tts_synthesis"):
+        async with tts_budget.slot():
+            response = await call_with_retry_async(attempt, tts_breaker, retry_policy, deadline)
+    
+    tts_cache.put_memory(cache_key, response.audio_content)
+    await disk_executor.run(tts_cache.put_disk, cache_key, response.audio_content)
+    return response.audio_content
+
+async def cached_speech(cache_key: str) -> Optional[bytes]:
+    """
+    Cached audio for cache_key; the disk tier is only read, on the disk executor, on a memory miss
+    """
+    audio = tts_cache.get_memory(cache_key)
+    if audio is None:
+        audio = await disk_executor.run(tts_cache.get, cache_key)
+    return audio
+
+@app.get("/api/tts/audio", dependencies=[Depends(enforce_rate_limit)])
+async def text_to_speech_audio(request: Request, text: str, voice_id: Optional[str] = None, model_name: str = DEFAULT_TTS_MODEL, prompt: str = ""):
+    """
+    Convert text to speech and return raw audio/mpeg bytes, so an <audio> element
+    can point straight at this URL instead of decoding a base64 data URL.
+    Without voice_id the user's saved voice is used.
+    """
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Text cannot be empty")
+    require_valid_voice(voice_id)
+    # The same URL plays a different voice once the user changes their settings
+    cache_control = AUDIO_CACHE_CONTROL if voice_id else "private, no-cache"
+    voice_id = await resolve_voice_id(request, voice_id)
+    
+    try:
+        audio_content = await synthesize_speech_bytes(text, voice_id, model_name, prompt)
+    except Overloaded:
+        raise
+    except Exception as e:
+        logger.warning("Gemini TTS error, falling back to browser TTS", extra={"voice_id": voice_id, "error": str(e)})
+        FALLBACKS.inc(kind="browser_tts")
+        # The client falls back to browser TTS when the audio fails to load
+        raise HTTPException(status_code=503, detail="USE_BROWSER_TTS")
+    
+    return audio_response(request, audio_content, make_cache_key(text, voice_id, model_name, prompt), cache_control)
+
+@app.get("/api/tts/stream", dependencies=[Depends(enforce_rate_limit)])
+async def text_to_speech_stream_get(request: Request, text: str, voice_id: Optional[str] = None, model_name: str = DEFAULT_TTS_MODEL, prompt: str = ""):
+    """
+    Synthesize long text chunk by chunk and stream one continuous MP3, so an
+    <audio> element can start playing after the first sentence is ready.
+    Without voice_id the user's saved voice is used.
+    """
+    return await chunked_speech_response(text, await resolve_voice_id(request, voice_id), model_name, prompt)
+
+@app.post("/api/tts/stream", dependencies=[Depends(enforce_rate_limit)])
+async def text_to_speech_stream(request: TTSRequest):
+    """
+    Same as GET /api/tts/stream, for texts too long for a URL
+    """
+    return await chunked_speech_response(request.text, request.voice_id, request.model_name, request.prompt)
+
+async def chunked_speech_response(text: str, voice_id: str, model_name: str, prompt: str) -> StreamingResponse:
+    """
+    Split text at sentence boundaries, synthesize up to TTS_CHUNK_CONCURRENCY chunks
+    ahead of the one being sent, and stream the MP3 data in order. Each chunk is
+    cached on its own. The first chunk is awaited before responding so a failure
+    can still be reported as 503 USE_BROWSER_TTS.
+    """
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Text cannot be empty")
+    if len(text) > TTS_STREAM_MAX_CHARS:
+        raise HTTPException(status_code=400, detail=f"Text must be at most {TTS_STREAM_MAX_CHARS} characters")
+    require_valid_voice(voice_id)
+    
+    chunks = split_text(text, TTS_CHUNK_MAX_CHARS)
+    window: Deque[asyncio.Future] = deque()
+    next_chunk = 0
+    
+    def fill_window():
+        nonlocal next_chunk
+        while next_chunk < len(chunks) and len(window) < TTS_CHUNK_CONCURRENCY:
+            window.append(asyncio.ensure_future(
+                synthesize_speech_bytes(chunks[next_chunk], voice_id, model_name, prompt)
+            ))
+            next_chunk += 1
+    
+    def cancel_window():
+        for task in window:
+            task.cancel()
+    
+    fill_window()
+    try:
+        first = await window.popleft()
+    except Overloaded:
+        cancel_window()
+        raise
+    except Exception as e:
+        cancel_window()
+        logger.warning("Gemini TTS error, falling back to browser TTS", extra={"voice_id": voice_id, "error": str(e)})
+        FALLBACKS.inc(kind="browser_tts")
+        raise HTTPException(status_code=503, detail="USE_BROWSER_TTS")
+    
+    async def audio_chunks():
+        try:
+            yield strip_id3(first, keep_header=True)
+            fill_window()
+            while window:
+                try:
+                    audio = await window.popleft()
+                except Exception as e:
+                    # Headers are already sent; end the audio early rather than mid-frame
+                    logger.warning("Chunked TTS stopped early", extra={"voice_id": voice_id, "error": str(e)})
+                    return
+                fill_window()
+                yield strip_id3(audio)
+        finally:
+            cancel_window()
+    
+    return StreamingResponse(
+        audio_chunks(),
+        media_type="audio/mpeg",
+        headers={"Cache-Control": "no-store", "X-Audio-Chunks": str(len(chunks))},
+    )
+
+@app.get("/api/tts/{audio_id}", dependencies=[Depends(enforce_rate_limit)])
+async def get_tts_audio(request: Request, audio_id: str):
+    """
+    Return previously synthesized audio by its content hash
+    """
+    if not AUDIO_ID_PATTERN.fullmatch(audio_id):
+        raise HTTPException(status_code=404, detail="Audio not found")
+    
+    audio_content = await cached_speech(audio_id)
+    if audio_content is None:
+        # Audio that is still being prefetched, here or by another worker,
+        # is returned as soon as it is ready
+        pending = tts_flights.pending(audio_id)
+        try:
+            if pending is not None:
+                audio_content = await asyncio.shield(pending)
+            else:
+                audio_content = await tts_flights.wait_remote(audio_id)
+        except Overloaded:
+            raise
+        except Exception:
+            FALLBACKS.inc(kind="browser_tts")
+            raise HTTPException(status_code=503, detail="USE_BROWSER_TTS")
+        if audio_content is None:
+            raise HTTPException(status_code=404, detail="Audio not found")
+    
+    return audio_response(request, audio_content, audio_id)
+
+@app.post("/api/tts/batch", response_model=TTSBatchResponse, dependencies=[Depends(enforce_rate_limit)])
+async def text_to_speech_batch(request: TTSBatchRequest):
+    """
+    Synthesize many texts in parallel and return a playable URL for each
+    """
+    require_valid_voice(request.voice_id)
+    texts = [text for text in request.texts if text.strip()]
+    if not texts:
+        raise HTTPException(status_code=400, detail="Texts cannot be empty")
+    if len(texts) > TTS_BATCH_MAX_TEXTS:
+        raise HTTPException(status_code=400, detail=f"At most {TTS_BATCH_MAX_TEXTS} texts per batch")
+    
+    async def synthesize(text: str) -> TTSBatchItem:
+        audio_id = make_cache_key(text, request.voice_id, request.model_name, request.prompt)
+        try:
+            if not await disk_executor.run(tts_cache.contains, audio_id):
+                async with get_prefetch_semaphore():
+                    await synthesize_speech_bytes(text, request.voice_id, request.model_name, request.prompt)
+            status = "ready"
+        except Overloaded:
+            raise
+        except Exception as e:
+            logger.warning("Gemini TTS error, falling back to browser TTS", extra={"voice_id": request.voice_id, "error": str(e)})
+            FALLBACKS.inc(kind="browser_tts")
+            status = "USE_BROWSER_TTS"
+        return TTSBatchItem(audio_id=audio_id, audio_url=f"/api/tts/{audio_id}", status=status)
+    
+    items = await asyncio.gather(*(synthesize(text) for text in texts))
+    return TTSBatchResponse(items=items)
+
+def start_speech_prefetch(text: str, voice_id: str, model_name: str, prompt: str) -> str:
+    """
+    Start synthesizing text in the background and return the URL it will be served from
+    """
+    cache_key = make_cache_key(text, voice_id, model_name, prompt)
+    if tts_cache.get_memory(cache_key, count=False) is not None or tts_flights.pending(cache_key) is not None:
+        return f"/api/tts/{cache_key}"
+    
+    async def limited_synthesis() -> bytes:
+        # The disk tier is only checked here, off the event loop
+        cached = await disk_executor.run(tts_cache.get, cache_key, False)
+        if cached is not None:
+            return cached
+        async with get_prefetch_semaphore():
+            return await synthesize_and_cache_speech(cache_key, text, voice_id, model_name, prompt)
+    
+    async def prefetch():
+        try:
+            await tts_flights.do(cache_key, limited_synthesis)
+        except Exception as e:
+            logger.warning("Audio prefetch failed", extra={"voice_id": voice_id, "error": str(e)})
+    
+    task = asyncio.create_task(prefetch())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return f"/api/tts/{cache_key}"
+
+def get_prefetch_semaphore() -> asyncio.Semaphore:
+    """
+    Limit on concurrent background/batch syntheses, created on the running loop
+    """
+    global prefetch_semaphore
+    if prefetch_semaphore is None:
+        prefetch_semaphore = asyncio.Semaphore(TTS_PREFETCH_CONCURRENCY)
+    return prefetch_semaphore
+
+def audio_response(request: Request, audio_content: bytes, audio_id: str,
+                   cache_control: str = AUDIO_CACHE_CONTROL) -> Response:
+    """
+    Build an audio/mpeg response with ETag, conditional GET and single Range support
+    """
+    etag = f'"{audio_id}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": cache_control,
+    }
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    total = len(audio_content)
+    byte_range = parse_range_header(request.headers.get("range"), total)
+    if byte_range is None:
+        return Response(content=audio_content, media_type="audio/mpeg", headers=headers)
+    
+    if byte_range == (-1, -1):
+        headers["Content-Range"] = f"bytes */{total}"
+        return Response(status_code=416, headers=headers)
+    
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+    return Response(content=audio_content[start:end + 1], status_code=206, media_type="audio/mpeg", headers=headers)
+
+def parse_range_header(range_header: Optional[str], total: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=" range into an inclusive (start, end) tuple.
+    Returns None to serve the whole body and (-1, -1) if the range is unsatisfiable.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    if total == 0:
+        # No byte range of an empty body can be satisfied
+        return (-1, -1)
+    
+    start_text, _, end_text = range_header[6:].strip().partition("-")
+    try:
+        if start_text == "":
+            # Suffix range: the last N bytes
+            length = int(end_text)
+            if length <= 0:
+                return (-1, -1)
+            return (max(total - length, 0), total - 1)
+        start = int(start_text)
+        end = int(end_text) if end_text else total - 1
+    except ValueError:
+        return None
+    
+    if start >= total or start > end:
+        return (-1, -1)
+    return (start, min(end, total - 1))
+
+@app.get("/api/stats")
+async def get_stats():
+    """
+    Cache counters for sizing and monitoring
+    """
+    # The quote cache and settings store count their rows in SQLite
+    return await disk_executor.run(collect_stats)
+
+def collect_stats() -> Dict[str, Dict[str, float]]:
+    return {
+        "tts_cache": tts_cache.stats(),
+        "quote_cache": quote_cache.stats(),
+        "upstream_executor": upstream_executor.stats(),
+        "quote_flights": quote_flights.stats(),
+        "quote_streams": quote_streams.stats(),
+        "tts_flights": tts_flights.stats(),
+        "tts_client_pool": tts_client_pool.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "gemini_budget": gemini_budget.stats(),
+        "tts_budget": tts_budget.stats(),
+        "gemini_breaker": gemini_breaker.stats(),
+        "tts_breaker": tts_breaker.stats(),
+        "settings_store": settings_store.stats(),
+        "cache_warmer": cache_warmer.stats(),
+    }
+
+def component_gauges():
+    """
+    Expose every /api/stats value on /metrics as voice_<component>_<stat>
+    """
+    for component, stats in collect_stats().items():
+        for name, value in stats.items():
+            yield f"voice_{component}_{name}", f"{component} {name.replace('_', ' ')}", value
+
+REGISTRY.register_collector(component_gauges)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Metrics in the Prometheus text exposition format
+    """
+    return PlainTextResponse(await disk_executor.run(REGISTRY.render), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/voices", response_model=VoicesResponse)
-async def get_available_voices():
-    """
-    Get available voices for Gemini TTS (based on official Google Cloud documentation)
-    """
-    # Official Gemini TTS voices from Google Cloud documentation with correct gender mapping
-    voices = [
-        VoiceOption(id="Achernar", name="Achernar", description="Gemini TTS Voice - US English", gender="Female"),
-        VoiceOption(id="Achird", name="Achird", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Algenib", name="Algenib", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Algieba", name="Algieba", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Alnilam", name="Alnilam", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Aoede", name="Aoede", description="Gemini TTS Voice - US English (Default)", gender="Female"),
-        VoiceOption(id="Autonoe", name="Autonoe", description="Gemini TTS Voice - US English", gender="Female"),
-        VoiceOption(id="Callirrhoe", name="Callirrhoe", description="Gemini TTS Voice - US English", gender="Female"),
-        VoiceOption(id="Charon", name="Charon", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Despina", name="Despina", description="Gemini TTS Voice - US English", gender="Female"),
-        VoiceOption(id="Enceladus", name="Enceladus", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Erinome", name="Erinome", description="Gemini TTS Voice - US English", gender="Female"),
-        VoiceOption(id="Fenrir", name="Fenrir", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Gacrux", name="Gacrux", description="Gemini TTS Voice - US English", gender="Female"),
-        VoiceOption(id="Iapetus", name="Iapetus", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Kore", name="Kore", description="Gemini TTS Voice - US English", gender="Female"),
-        VoiceOption(id="Laomedeia", name="Laomedeia", description="Gemini TTS Voice - US English", gender="Female"),
-        VoiceOption(id="Leda", name="Leda", description="Gemini TTS Voice - US English", gender="Female"),
-        VoiceOption(id="Orus", name="Orus", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Pulcherrima", name="Pulcherrima", description="Gemini TTS Voice - US English", gender="Female"),
-        VoiceOption(id="Puck", name="Puck", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Rasalgethi", name="Rasalgethi", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Sadachbia", name="Sadachbia", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Sadaltager", name="Sadaltager", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Schedar", name="Schedar", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Sulafat", name="Sulafat", description="Gemini TTS Voice - US English", gender="Female"),
-        VoiceOption(id="Umbriel", name="Umbriel", description="Gemini TTS Voice - US English", gender="Male"),
-        VoiceOption(id="Vindemiatrix", name="Vindemiatrix", description="Gemini TTS Voice - US English", gender="Female"),
-        VoiceOption(id="Zephyr", name="Zephyr", description="Gemini TTS Voice - US English", gender="Female"),
-        VoiceOption(id="Zubenelgenubi", name="Zubenelgenubi", description="Gemini TTS Voice - US English", gender="Male"),
-    ]
-    
-    return VoicesResponse(voices=voices)
+async def get_available_voices(request: Request):
+    """
+    Get available voices for Gemini TTS (based on official Google Cloud documentation).
+    The catalog is serialized once; clients revalidate it with its ETag.
+    """
+    headers = {"ETag": VOICES_ETAG, "Cache-Control": "public, max-age=86400"}
+    if request.headers.get("if-none-match") == VOICES_ETAG:
+        return Response(status_code=304, headers=headers)
+    return Response(content=VOICES_JSON, media_type="application/json", headers=headers)
+
+def get_user_id(request: Request) -> Optional[str]:
+    """
+    The user id from the settings cookie, if it is present and well-formed
+    """
+    user_id = request.cookies.get(USER_COOKIE)
+    if user_id and USER_ID_PATTERN.fullmatch(user_id):
+        return user_id
+    return None
+
+def require_valid_voice(voice_id: Optional[str]):
+    """
+    Reject unknown voices up front, before they reach Cloud TTS
+    """
+    if voice_id is not None and not is_valid_voice(voice_id):
+        raise HTTPException(status_code=400, detail="Invalid voice ID")
+
+async def resolve_voice_id(request: Request, voice_id: Optional[str]) -> str:
+    """
+    The voice a request asked for, else the user's saved voice, else the default
+    """
+    if voice_id:
+        return voice_id
+    user_id = get_user_id(request)
+    saved = await disk_executor.run(settings_store.voice_id, user_id) if user_id else None
+    return saved or DEFAULT_VOICE_ID
+
+@app.get("/api/settings", response_model=UserSettings)
+async def get_settings(request: Request):
+    """
+    The current user's saved settings, with defaults for anything unsaved
+    """
+    user_id = get_user_id(request)
+    return UserSettings(**(await disk_executor.run(settings_store.get, user_id) if user_id else DEFAULT_SETTINGS))
 
 @app.post("/api/settings", response_model=SettingsResponse)
-async def save_settings(request: SettingsRequest):
+async def save_settings(request: SettingsRequest, http_request: Request, response: Response):
     """
-    Save user settings (voice preference)
+    Save user settings (voice preference) for the user identified by the settings cookie,
+    issuing the cookie on first save
     """
     try:
-        # In a real application, you would save this to a database or config file
-        # For now, we'll just validate the voice exists
-        voices_response = await get_available_voices()
-        voice_ids = [voice.id for voice in voices_response.voices]
+        if request.voice_id is not None and not is_valid_voice(request.voice_id):
+            return SettingsResponse(success=False, message=f"Invalid voice ID: {request.voice_id}")
+        
+        user_id = get_user_id(http_request)
+        if user_id is None:
+            user_id = secrets.token_urlsafe(24)
+            response.set_cookie(USER_COOKIE, user_id, max_age=365 * 24 * 3600, httponly=True, samesite="lax")
         
-        if request.voice_id not in voice_ids:
-            raise HTTPException(status_code=400, detail="Invalid voice ID")
+        changes = request.model_dump(exclude_none=True)
+        await disk_executor.run(settings_store.update, user_id, changes)
         
-        # Here you would typically save to database or session
-        # For demo purposes, we'll just return success
-        return SettingsResponse(success=True, message=f"Voice setting saved: {request.voice_id}")
+        if request.voice_id is not None:
+            return SettingsResponse(success=True, message=f"Voice setting saved: {request.voice_id}")
+        return SettingsResponse(success=True, message="Settings saved")
     
     except Exception as e:
         return SettingsResponse(success=False, message=f"Error saving settings: {str(e)}")
 
+@app.delete("/api/settings", response_model=SettingsResponse)
+async def reset_settings(request: Request):
+    """
+    Forget the current user's saved settings
+    """
+    user_id = get_user_id(request)
+    if user_id is not None:
+        await disk_executor.run(settings_store.delete, user_id)
+    return SettingsResponse(success=True, message="Settings reset")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if workers > 1:
+        # Workers import the app themselves and coordinate through the shared caches
+        os.environ.setdefault("COORDINATION_BACKEND", "sqlite")
+        uvicorn.run("app:app", host="0.0.0.0", port=8000, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
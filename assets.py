@@ -0,0 +1,186 @@
+import gzip
+import hashlib
+import logging
+import os
+import re
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip variants are built without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Pages served from memory, by route, and the toolbar inlined into each
+PAGES = {"/": "home.html", "/quotes": "quotes.html", "/settings": "settings.html"}
+TOOLBAR = "index.html"
+TOOLBAR_PLACEHOLDER = '<div id="toolbar-container"></div>'
+# Fingerprinted bundles are served under ASSET_PREFIX and never change
+ASSET_PREFIX = "/assets/"
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+CONTENT_TYPES = {".css": "text/css; charset=utf-8", ".js": "application/javascript; charset=utf-8", ".html": "text/html; charset=utf-8"}
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+
+CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+CSS_SPACE = re.compile(r"\s+")
+CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+CSS_COLON = re.compile(r":\s+")
+JS_LINE_COMMENT = re.compile(r"^\s*//")
+ASSET_REFERENCE = re.compile(r'(?P<attr>href|src)="/static/(?P<name>[\w.-]+\.(?:css|js))"')
+
+
+def minify_css(css: str) -> str:
+    css = CSS_COMMENT.sub("", css)
+    css = CSS_SPACE.sub(" ", css)
+    css = CSS_PUNCTUATION.sub(r"\1", css)
+    css = CSS_COLON.sub(":", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_js(js: str) -> str:
+    """
+    Drop indentation, blank lines and whole-line comments. Line breaks are kept,
+    so automatic semicolon insertion and string contents are unaffected.
+    """
+    lines = (line.strip() for line in js.splitlines())
+    return "\n".join(line for line in lines if line and not JS_LINE_COMMENT.match(line)) + "\n"
+
+
+def accepted_encodings(header: Optional[str]) -> Dict[str, float]:
+    """
+    Parse Accept-Encoding into {coding: q}, e.g. "gzip, br;q=0.5" -> {"gzip": 1.0, "br": 0.5}
+    """
+    encodings: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        encodings[coding.strip().lower()] = q
+    return encodings
+
+
+class Asset(NamedTuple):
+    body: bytes
+    content_type: str
+    etag: str
+    cache_control: str
+    gzip: Optional[bytes]
+    br: Optional[bytes]
+
+    @classmethod
+    def build(cls, body: bytes, content_type: str, cache_control: str) -> "Asset":
+        compressible = len(body) >= MIN_COMPRESS_BYTES
+        return cls(
+            body=body,
+            content_type=content_type,
+            etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+            cache_control=cache_control,
+            gzip=gzip.compress(body, compresslevel=9, mtime=0) if compressible else None,
+            br=brotli.compress(body) if compressible and brotli is not None else None,
+        )
+
+    def variant(self, accept_encoding: Optional[str] = None) -> Tuple[Optional[str], bytes]:
+        """
+        (content coding, body) of the smallest variant the client accepts; None is the identity body
+        """
+        accepted = accepted_encodings(accept_encoding)
+        if self.br is not None and accepted.get("br", 0) > 0:
+            return "br", self.br
+        if self.gzip is not None and accepted.get("gzip", 0) > 0:
+            return "gzip", self.gzip
+        return None, self.body
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """
+        Strong ETag of one variant: each encoded body is a different representation, e.g. "<hash>-gzip"
+        """
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+    def response(self, accept_encoding: Optional[str] = None, if_none_match: Optional[str] = None) -> Response:
+        """
+        The smallest variant the client accepts, or 304 if it already has that variant
+        """
+        encoding, body = self.variant(accept_encoding)
+        etag = self.etag_for(encoding)
+        headers = {"ETag": etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        if if_none_match == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type=self.content_type, headers=headers)
+
+
+class AssetBundle:
+    """
+    Static pages and their CSS/JS, prepared once at startup.
+
+    CSS and JS are minified and renamed after a hash of their content
+    (styles.css -> styles.3f2a9c1b0d.css) so they can be cached forever; the
+    pages reference those names, have the navigation toolbar inlined and are
+    revalidated by ETag. Every body is kept in memory with precompressed
+    gzip (and brotli, when installed) variants.
+    """
+
+    def __init__(self, static_dir: str = "static"):
+        self.static_dir = static_dir
+        self.assets: Dict[str, Asset] = {}
+        self.pages: Dict[str, Asset] = {}
+        # Original file name -> fingerprinted URL
+        self.urls: Dict[str, str] = {}
+
+        for name in sorted(os.listdir(static_dir)):
+            extension = os.path.splitext(name)[1]
+            if extension not in (".css", ".js"):
+                continue
+            source = self._read(name)
+            minified = minify_css(source) if extension == ".css" else minify_js(source)
+            body = minified.encode("utf-8")
+            fingerprinted = f"{name[:-len(extension)]}.{hashlib.sha256(body).hexdigest()[:10]}{extension}"
+            self.assets[fingerprinted] = Asset.build(body, CONTENT_TYPES[extension], IMMUTABLE)
+            self.urls[name] = ASSET_PREFIX + fingerprinted
+
+        toolbar = self._read(TOOLBAR)
+        for route, name in PAGES.items():
+            html = self._render_page(self._read(name), toolbar, route)
+            self.pages[route] = Asset.build(html.encode("utf-8"), CONTENT_TYPES[".html"], REVALIDATE)
+
+        logger.info("Built static assets", extra={
+            "assets": len(self.assets),
+            "pages": len(self.pages),
+            "bytes": sum(len(asset.body) for asset in self.assets.values()),
+            "gzip_bytes": sum(len(asset.gzip or asset.body) for asset in self.assets.values()),
+            "brotli": brotli is not None,
+        })
+
+    def asset(self, name: str) -> Optional[Asset]:
+        return self.assets.get(name)
+
+    def page(self, route: str) -> Asset:
+        return self.pages[route]
+
+    def _render_page(self, html: str, toolbar: str, route: str) -> str:
+        # Mark the current page's link active, as the client-side script would
+        toolbar = toolbar.replace(f'href="{route}" class="toolbar-link"', f'href="{route}" class="toolbar-link active"')
+        html = html.replace(TOOLBAR_PLACEHOLDER, f'<div id="toolbar-container">{toolbar.strip()}</div>')
+
+        def fingerprint(match: re.Match) -> str:
+            url = self.urls.get(match.group("name"))
+            return f'{match.group("attr")}="{url}"' if url else match.group(0)
+
+        return ASSET_REFERENCE.sub(fingerprint, html)
+
+    def _read(self, name: str) -> str:
+        with open(os.path.join(self.static_dir, name), encoding="utf-8") as f:
+            return f.read()
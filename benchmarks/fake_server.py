@@ -0,0 +1,17 @@
+"""
+The app with its upstreams replaced by benchmarks.fakes, importable as a real
+server for benchmarks that need separate worker processes:
+
+    FAKE_LATENCY_MS=200 uvicorn benchmarks.fake_server:app --workers 4
+"""
+
+import os
+
+from benchmarks import fakes
+
+fakes.CONFIG.latency_ms = float(os.getenv("FAKE_LATENCY_MS", str(fakes.CONFIG.latency_ms)))
+fakes.CONFIG.audio_bytes = int(os.getenv("FAKE_AUDIO_BYTES", str(fakes.CONFIG.audio_bytes)))
+fakes.CALLS_DIR = os.getenv("FAKE_CALLS_DIR") or None
+fakes.install()
+
+from app import app  # noqa: E402
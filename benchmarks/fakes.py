@@ -0,0 +1,167 @@
+"""
+Local stand-ins for the Gemini and Cloud TTS clients used by the benchmarks.
+
+Latency, payload size and error rate are configurable so the request path can be
+measured without network access or API quotas.
+"""
+
+import json
+import os
+import random
+import sys
+import time
+import types
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+
+@dataclass
+class FakeUpstreamConfig:
+    latency_ms: float = 200.0  # Mean latency of each upstream call
+    jitter_ms: float = 0.0  # Uniform +/- jitter added to the latency
+    error_rate: float = 0.0  # Fraction of calls that raise
+    quote_count: int = 5  # Quotes per generated response
+    quote_chars: int = 120  # Length of each generated quote
+    audio_bytes: int = 48 * 1024  # Size of each synthesized clip
+    stream_chunks: int = 6  # Chunks per streamed Gemini response
+
+
+CONFIG = FakeUpstreamConfig()
+
+# Upstream call counters, so cache and coalescing effects show up in the report
+CALLS = {"generate_content": 0, "synthesize_speech": 0, "clients_created": 0}
+# When set, every call also appends one byte to CALLS_DIR/<counter>, so calls made
+# by several server processes can be totalled (see read_shared_calls)
+CALLS_DIR: Optional[str] = None
+
+
+def _record_call(counter: str) -> None:
+    CALLS[counter] += 1
+    if CALLS_DIR:
+        with open(os.path.join(CALLS_DIR, counter), "ab") as f:
+            f.write(b".")
+
+
+def read_shared_calls(directory: str) -> dict:
+    calls = {}
+    for counter in CALLS:
+        try:
+            calls[counter] = os.path.getsize(os.path.join(directory, counter))
+        except OSError:
+            calls[counter] = 0
+    return calls
+
+
+class FakeUpstreamError(google_exceptions.ServiceUnavailable):
+    """
+    Injected failure; a transient 503 like the real APIs return when overloaded
+    """
+
+
+def _simulate_call(timeout: Optional[float] = None) -> None:
+    delay = max(CONFIG.latency_ms + random.uniform(-CONFIG.jitter_ms, CONFIG.jitter_ms), 0.0) / 1000.0
+    if timeout is not None and delay > timeout:
+        time.sleep(timeout)
+        raise google_exceptions.DeadlineExceeded("Fake upstream call timed out")
+    time.sleep(delay)
+    if CONFIG.error_rate and random.random() < CONFIG.error_rate:
+        raise FakeUpstreamError("Injected upstream failure")
+
+
+class _FakeText:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """
+    Mimics google.generativeai.GenerativeModel.generate_content
+    """
+
+    def __init__(self, model_name: str = "", **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, contents, generation_config=None, stream: bool = False, request_options=None, **kwargs):
+        _record_call("generate_content")
+        timeout = (request_options or {}).get("timeout")
+        if not generation_config:
+            # Legacy YES/NO person check
+            _simulate_call(timeout)
+            return _FakeText("NO")
+
+        result = self._result()
+        if generation_config.get("response_schema", {}).get("type") != "object":
+            # Two-call mode asks for the bare quotes array
+            result = result["quotes"]
+        text = json.dumps(result)
+
+        if not stream:
+            _simulate_call(timeout)
+            return _FakeText(text)
+        return self._stream(text)
+
+    def _stream(self, text: str) -> Iterator[_FakeText]:
+        chunks = max(CONFIG.stream_chunks, 1)
+        size = -(-len(text) // chunks)
+        per_chunk_ms = CONFIG.latency_ms / chunks
+        for start in range(0, len(text), size):
+            time.sleep(per_chunk_ms / 1000.0)
+            if CONFIG.error_rate and random.random() < CONFIG.error_rate / chunks:
+                raise FakeUpstreamError("Injected upstream failure")
+            yield _FakeText(text[start:start + size])
+
+    def _result(self):
+        quote = ("x" * CONFIG.quote_chars)
+        return {
+            "is_person": False,
+            "quotes": [
+                {"quote": f"{i} {quote}", "context": "Benchmark"} for i in range(CONFIG.quote_count)
+            ],
+        }
+
+
+class _FakeTransport:
+    def close(self):
+        pass
+
+
+class _FakeAudioResponse:
+    def __init__(self, audio_content: bytes):
+        self.audio_content = audio_content
+
+
+class FakeTextToSpeechClient:
+    """
+    Mimics google.cloud.texttospeech.TextToSpeechClient.synthesize_speech
+    """
+
+    def __init__(self, *args, **kwargs):
+        _record_call("clients_created")
+        self.transport = _FakeTransport()
+
+    def synthesize_speech(self, input=None, voice=None, audio_config=None, timeout=None, **kwargs):
+        _record_call("synthesize_speech")
+        _simulate_call(timeout)
+        # ID3 header followed by filler frames, enough to exercise the byte path
+        return _FakeAudioResponse(b"ID3\x04\x00\x00\x00\x00\x00\x00" + b"\xff" * CONFIG.audio_bytes)
+
+
+def install() -> None:
+    """
+    Replace the real client classes before app is imported
+    """
+    import google.generativeai as genai
+    from google.cloud import texttospeech
+
+    genai.GenerativeModel = FakeGenerativeModel
+    genai.configure = lambda **kwargs: None
+    texttospeech.TextToSpeechClient = FakeTextToSpeechClient
+
+    # config.py holds the real API key and is not checked in; the fakes never use it
+    if "config" not in sys.modules:
+        try:
+            import config  # noqa: F401
+        except ImportError:
+            sys.modules["config"] = types.SimpleNamespace(GEMINI_API_KEY="benchmark")
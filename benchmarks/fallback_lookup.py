@@ -0,0 +1,120 @@
+"""
+Micro-benchmark of fallback quote lookups as the corpus grows.
+
+The bundled corpus is measured first, then synthetic corpora of increasing size
+(random author names, topics and quote words) so index build time and lookup
+latency can be compared across scales. Results are printed as JSON.
+
+Examples:
+    python -m benchmarks.fallback_lookup
+    python -m benchmarks.fallback_lookup --sizes 1000 10000 100000 --queries 2000
+"""
+
+import argparse
+import json
+import random
+import string
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from fallback_corpus import DEFAULT_CORPUS_PATH, FallbackCorpus
+from benchmarks.loadtest import percentile
+
+
+def random_word(rng: random.Random, low: int = 4, high: int = 10) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+
+def misspell(rng: random.Random, word: str) -> str:
+    """
+    Swap two adjacent letters, the most common typo
+    """
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def synthetic_entries(size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    size entries by size/5 authors, over 500 topics and a 5000-word quote vocabulary
+    """
+    rng = random.Random(seed)
+    authors = [f"{random_word(rng).title()} {random_word(rng).title()}" for _ in range(max(size // 5, 1))]
+    topics = [random_word(rng) for _ in range(500)]
+    words = [random_word(rng, 2, 9) for _ in range(5000)]
+    return [
+        {
+            "quote": " ".join(rng.choice(words) for _ in range(rng.randint(6, 20))) + ".",
+            "author": rng.choice(authors),
+            "topics": rng.sample(topics, 3),
+        }
+        for _ in range(size)
+    ]
+
+
+def query_kinds(entries: List[Dict[str, Any]], rng: random.Random) -> Dict[str, Callable[[], str]]:
+    return {
+        "author": lambda: rng.choice(entries)["author"],
+        "author_typo": lambda: misspell(rng, rng.choice(entries)["author"].split()[-1].lower()),
+        "topic": lambda: rng.choice(rng.choice(entries)["topics"]),
+        "miss": lambda: random_word(rng, 12, 14),
+    }
+
+
+def measure(name: str, entries: List[Dict[str, Any]], queries: int, seed: int = 0) -> Dict[str, Any]:
+    started = time.perf_counter()
+    corpus = FallbackCorpus(entries)
+    build_seconds = time.perf_counter() - started
+
+    rng = random.Random(seed)
+    lookups: Dict[str, Any] = {}
+    for kind, make_query in query_kinds(entries, rng).items():
+        subjects = [make_query() for _ in range(queries)]
+        latencies = []
+        for subject in subjects:
+            started = time.perf_counter()
+            corpus.search(subject)
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        lookups[kind] = {
+            "p50_us": round(percentile(latencies, 0.50) * 1e6, 1),
+            "p99_us": round(percentile(latencies, 0.99) * 1e6, 1),
+            "max_us": round(latencies[-1] * 1e6, 1),
+        }
+
+    return {
+        "corpus": name,
+        "entries": len(corpus),
+        "indexed_tokens": len(corpus._postings),
+        "build_ms": round(build_seconds * 1000, 1),
+        "lookup": lookups,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS_PATH, help="Real corpus to measure first")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=1000, help="Lookups per query kind")
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    with open(args.corpus, encoding="utf-8") as f:
+        results = [measure(args.corpus, json.load(f), args.queries)]
+    for size in args.sizes:
+        results.append(measure(f"synthetic-{size}", synthetic_entries(size), args.queries))
+
+    output = json.dumps({"results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
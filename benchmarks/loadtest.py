@@ -0,0 +1,300 @@
+"""
+Load and latency benchmark for the request path.
+
+Requests are driven straight through the ASGI app (no sockets) with the Gemini
+and Cloud TTS clients replaced by configurable local fakes. Results are printed
+as JSON, one object per (scenario, concurrency) pair.
+
+Examples:
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --scenarios quotes tts --concurrency 1 8 32 --requests 400
+    python -m benchmarks.loadtest --no-cache --latency-ms 300 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from benchmarks import fakes
+
+# (method, path, JSON body) for the i-th request of a scenario
+RequestFactory = Callable[[int], Tuple[str, str, Optional[Dict[str, Any]]]]
+
+
+def subject_for(i: int, distinct: int) -> str:
+    return f"benchmark subject {i % distinct}" if distinct else f"benchmark subject {i}"
+
+
+def long_text_for(i: int, distinct: int, sentences: int = 20) -> str:
+    subject = subject_for(i, distinct)
+    return " ".join(f"Sentence {n} of a long passage about {subject}, read aloud in full." for n in range(sentences))
+
+
+def build_scenarios(distinct: int) -> Dict[str, RequestFactory]:
+    return {
+        "quotes": lambda i: ("POST", "/api/quotes", {"subject": subject_for(i, distinct)}),
+        "quotes_stream": lambda i: ("GET", f"/api/quotes/stream?subject={subject_for(i, distinct).replace(' ', '+')}", None),
+        "tts": lambda i: ("POST", "/api/tts", {"text": subject_for(i, distinct), "voice_id": "Aoede"}),
+        "tts_stream": lambda i: ("POST", "/api/tts/stream", {"text": long_text_for(i, distinct), "voice_id": "Aoede"}),
+        "tts_audio": lambda i: ("GET", f"/api/tts/audio?text={subject_for(i, distinct).replace(' ', '+')}&voice_id=Aoede", None),
+        "voices": lambda i: ("GET", "/api/voices", None),
+        "static": lambda i: ("GET", random.choice(["/", "/quotes", "/settings", "/static/styles.css", "/static/quotes.js"]), None),
+    }
+
+
+class ASGIResponse(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    # Seconds until the first non-empty body chunk
+    first_byte: float
+
+
+async def asgi_request(app, method: str, path: str, body: Optional[Dict[str, Any]] = None,
+                       headers: Optional[Dict[str, str]] = None) -> ASGIResponse:
+    """
+    Send one HTTP request through the ASGI app and collect the response
+    """
+    path, _, query = path.partition("?")
+    payload = json.dumps(body).encode() if body is not None else b""
+    raw_headers = [(b"host", b"benchmark")]
+    if body is not None:
+        raw_headers += [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+    for name, value in (headers or {}).items():
+        raw_headers.append((name.lower().encode(), value.encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": raw_headers,
+        "client": ("127.0.0.1", random.randint(1024, 65535)),
+        "server": ("benchmark", 80),
+    }
+
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        # Block like a client that keeps the connection open
+        await asyncio.Event().wait()
+
+    status = 0
+    response_headers: Dict[str, str] = {}
+    chunks: List[bytes] = []
+    first_byte = 0.0
+    started = time.perf_counter()
+
+    async def send(message):
+        nonlocal status, first_byte
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers.update((name.decode(), value.decode()) for name, value in message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            if chunk and not chunks:
+                first_byte = time.perf_counter() - started
+            if chunk:
+                chunks.append(chunk)
+
+    await app(scope, receive, send)
+    return ASGIResponse(status, response_headers, b"".join(chunks), first_byte)
+
+
+class Lifespan:
+    """
+    Runs the app's ASGI lifespan startup and shutdown around the benchmark
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._messages: asyncio.Queue = asyncio.Queue()
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._task = None
+
+    async def __aenter__(self):
+        async def receive():
+            return await self._messages.get()
+
+        async def send(message):
+            await self._events.put(message)
+
+        self._task = asyncio.create_task(self.app({"type": "lifespan", "asgi": {"version": "3.0"}}, receive, send))
+        await self._messages.put({"type": "lifespan.startup"})
+        message = await self._events.get()
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"Lifespan startup failed: {message}")
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._messages.put({"type": "lifespan.shutdown"})
+        await self._events.get()
+        await self._task
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def run_level(app, name: str, factory: RequestFactory, concurrency: int, requests: int,
+                    offset: int) -> Dict[str, Any]:
+    """
+    Issue `requests` requests with `concurrency` in flight and summarize them
+    """
+    latencies: List[float] = []
+    first_bytes: List[float] = []
+    statuses: Dict[str, int] = {}
+    response_bytes = 0
+    next_index = 0
+    calls_before = dict(fakes.CALLS)
+
+    async def worker():
+        nonlocal next_index, response_bytes
+        while next_index < requests:
+            i = next_index
+            next_index += 1
+            method, path, body = factory(offset + i)
+            started = time.perf_counter()
+            response = await asgi_request(app, method, path, body)
+            latencies.append(time.perf_counter() - started)
+            first_bytes.append(response.first_byte)
+            statuses[str(response.status)] = statuses.get(str(response.status), 0) + 1
+            response_bytes += len(response.body)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    first_bytes.sort()
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "elapsed_s": round(elapsed, 4),
+        "rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+        # Time to first body chunk; time-to-first-quote for quotes_stream, time-to-first-audio for tts_stream
+        "first_byte_ms": {
+            "p50": round(percentile(first_bytes, 0.50) * 1000, 2),
+            "p95": round(percentile(first_bytes, 0.95) * 1000, 2),
+        },
+        "statuses": statuses,
+        "response_bytes": response_bytes,
+        "upstream_calls": {key: fakes.CALLS[key] - calls_before[key] for key in fakes.CALLS},
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", default=["quotes", "tts", "voices", "static"],
+                        choices=["quotes", "quotes_stream", "tts", "tts_stream", "tts_audio", "voices", "static"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--distinct", type=int, default=20,
+                        help="Distinct subjects/texts per scenario (0 makes every request unique)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the quote and TTS caches")
+    parser.add_argument("--latency-ms", type=float, default=fakes.CONFIG.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=fakes.CONFIG.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=fakes.CONFIG.error_rate)
+    parser.add_argument("--audio-bytes", type=int, default=fakes.CONFIG.audio_bytes)
+    parser.add_argument("--quote-chars", type=int, default=fakes.CONFIG.quote_chars)
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """
+    Point the app at throwaway cache locations before it is imported
+    """
+    state_dir = tempfile.mkdtemp(prefix="voice-bench-")
+    os.environ.setdefault("TTS_CACHE_DIR", os.path.join(state_dir, "tts"))
+    os.environ.setdefault("QUOTE_CACHE_PATH", os.path.join(state_dir, "quotes.sqlite3"))
+    os.environ.setdefault("SETTINGS_DB_PATH", os.path.join(state_dir, "settings.sqlite3"))
+    # Every benchmark request comes from the same client address
+    os.environ.setdefault("RATE_LIMIT_PER_SECOND", "0")
+    # Background warming would add upstream calls the benchmark did not make
+    os.environ.setdefault("WARM_ENABLED", "0")
+    if args.no_cache:
+        os.environ["TTS_CACHE_DIR"] = ""
+        os.environ["TTS_CACHE_MEMORY_MB"] = "0"
+        os.environ["QUOTE_CACHE_TTL_SECONDS"] = "0"
+        os.environ["QUOTE_CACHE_STALE_SECONDS"] = "0"
+
+    fakes.CONFIG.latency_ms = args.latency_ms
+    fakes.CONFIG.jitter_ms = args.jitter_ms
+    fakes.CONFIG.error_rate = args.error_rate
+    fakes.CONFIG.audio_bytes = args.audio_bytes
+    fakes.CONFIG.quote_chars = args.quote_chars
+    fakes.install()
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import app as app_module
+
+    scenarios = build_scenarios(args.distinct)
+    results = []
+    async with Lifespan(app_module.app):
+        for name in args.scenarios:
+            for level, concurrency in enumerate(args.concurrency):
+                results.append(await run_level(
+                    app_module.app, name, scenarios[name], concurrency, args.requests,
+                    offset=level * args.requests if not args.distinct else 0,
+                ))
+
+    return {
+        "config": {
+            "cache": not args.no_cache,
+            "distinct": args.distinct,
+            "upstream": vars(fakes.CONFIG),
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    configure_environment(args)
+    report = asyncio.run(run(args))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
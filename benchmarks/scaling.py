@@ -0,0 +1,230 @@
+"""
+Throughput scaling with the number of worker processes.
+
+For each worker count the app is started as a real server (uvicorn --workers,
+or gunicorn with gunicorn.conf.py) with fake upstreams, see
+benchmarks.fake_server. Every run starts from empty caches:
+
+1. Cold burst: every connection requests the same `distinct` subjects at once,
+   so duplicates land on different workers. Reports how many upstream calls
+   all workers made together; with coordination this stays at `distinct`.
+2. Steady state: `requests` cached quote requests over keep-alive connections.
+   Reports throughput and latency.
+
+Examples:
+    python -m benchmarks.scaling
+    python -m benchmarks.scaling --workers 1 2 4 8 --connections 64 --requests 8000
+    python -m benchmarks.scaling --coordination none --output scaling.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.fakes import read_shared_calls
+from benchmarks.loadtest import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args: argparse.Namespace, workers: int, port: int, state_dir: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        PYTHONPATH=ROOT,
+        TTS_CACHE_DIR=os.path.join(state_dir, "tts"),
+        QUOTE_CACHE_PATH=os.path.join(state_dir, "quotes.sqlite3"),
+        SETTINGS_DB_PATH=os.path.join(state_dir, "settings.sqlite3"),
+        COORDINATION_DB_PATH=os.path.join(state_dir, "leases.sqlite3"),
+        COORDINATION_BACKEND=args.coordination,
+        FAKE_CALLS_DIR=os.path.join(state_dir, "calls"),
+        FAKE_LATENCY_MS=str(args.latency_ms),
+        RATE_LIMIT_PER_SECOND="0",
+        WARM_ENABLED="0",
+        LOG_LEVEL="WARNING",
+        WEB_CONCURRENCY=str(workers),
+    )
+    os.makedirs(env["FAKE_CALLS_DIR"])
+    if args.server == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "-c", os.path.join(ROOT, "gunicorn.conf.py"),
+                   "--bind", f"127.0.0.1:{port}", "benchmarks.fake_server:app"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "benchmarks.fake_server:app", "--host", "127.0.0.1",
+                   "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    return subprocess.Popen(command, cwd=ROOT, env=env)
+
+
+async def http_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str, path: str,
+                       body: Optional[Dict[str, Any]] = None) -> Tuple[int, int]:
+    """
+    One HTTP/1.1 request on a keep-alive connection; returns (status, body bytes)
+    """
+    payload = json.dumps(body).encode() if body is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: benchmark\r\n"
+    if body is not None:
+        head += f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+    writer.write(head.encode() + b"\r\n" + payload)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length, chunked = 0, False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+
+    if not chunked:
+        return status, len(await reader.readexactly(length))
+    size = 0
+    while True:
+        chunk_size = int((await reader.readline()).split(b";")[0], 16)
+        await reader.readexactly(chunk_size + 2)
+        size += chunk_size
+        if chunk_size == 0:
+            return status, size
+
+
+async def wait_until_ready(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            status, _ = await http_request(reader, writer, "GET", "/api/voices")
+            writer.close()
+            if status == 200:
+                return
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Server on port {port} did not start")
+        await asyncio.sleep(0.2)
+
+
+async def drive(port: int, connections: int, requests: List[Tuple[str, str, Optional[Dict[str, Any]]]]) -> Dict[str, Any]:
+    """
+    Send requests over `connections` keep-alive connections, as fast as they are answered
+    """
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    next_index = 0
+
+    async def connection():
+        nonlocal next_index
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            while next_index < len(requests):
+                method, path, body = requests[next_index]
+                next_index += 1
+                started = time.perf_counter()
+                status, _ = await http_request(reader, writer, method, path, body)
+                latencies.append(time.perf_counter() - started)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(connections)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(requests),
+        "elapsed_s": round(elapsed, 4),
+        "rps": round(len(requests) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+        },
+        "statuses": statuses,
+    }
+
+
+async def run_workers(args: argparse.Namespace, workers: int) -> Dict[str, Any]:
+    state_dir = tempfile.mkdtemp(prefix="voice-scaling-")
+    port = free_port()
+    server = start_server(args, workers, port, state_dir)
+    try:
+        await wait_until_ready(port)
+        subjects = [f"scaling subject {i}" for i in range(args.distinct)]
+
+        # Every connection asks for every subject at about the same time
+        cold = [("POST", "/api/quotes", {"subject": subject}) for subject in subjects for _ in range(args.connections)]
+        cold_result = await drive(port, args.connections, cold)
+        cold_calls = read_shared_calls(os.path.join(state_dir, "calls"))
+
+        steady = [("POST", "/api/quotes", {"subject": subjects[i % len(subjects)]}) for i in range(args.requests)]
+        steady_result = await drive(port, args.connections, steady)
+        return {
+            "workers": workers,
+            "cold_burst": {
+                "requests": cold_result["requests"],
+                "distinct_subjects": args.distinct,
+                "upstream_generate_calls": cold_calls["generate_content"],
+                "statuses": cold_result["statuses"],
+            },
+            "steady_state": steady_result,
+        }
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--server", choices=["uvicorn", "gunicorn"], default="uvicorn")
+    parser.add_argument("--coordination", choices=["sqlite", "redis", "none"], default="sqlite",
+                        help="Cross-worker coalescing backend (redis also needs REDIS_URL)")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=4000, help="Steady-state requests per worker count")
+    parser.add_argument("--distinct", type=int, default=20, help="Distinct subjects")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Fake upstream latency")
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    results = [asyncio.run(run_workers(args, workers)) for workers in args.workers]
+    report = json.dumps({
+        "config": {
+            "server": args.server,
+            "coordination": args.coordination,
+            "connections": args.connections,
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
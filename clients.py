@@ -0,0 +1,165 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from upstream import BoundedExecutor
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the client itself is unusable (e.g. its credentials expired). Others,
+# such as ServiceUnavailable from an overloaded backend, only drop the client if its
+# channel turns out to be closed.
+CHANNEL_ERRORS = (
+    google_exceptions.Unauthenticated,
+)
+
+
+class ClientPool:
+    """
+    Fixed-size pool of long-lived upstream clients (e.g. TextToSpeechClient).
+
+    Clients are created once, handed out one caller at a time and returned
+    afterwards, so credential loading, channel setup and TLS handshakes are paid
+    at startup instead of per request. A slot whose gRPC channel shut down, or
+    whose client failed with a CHANNEL_ERRORS error, is rebuilt by the next
+    caller or by the periodic health check.
+    """
+
+    def __init__(self, factory: Callable[[], Any], executor: BoundedExecutor, size: int = 4):
+        self.factory = factory
+        self.executor = executor
+        self.size = size
+        self._idle: Optional[asyncio.Queue] = None
+        self._clients: List[Any] = []
+        self.created = 0
+        self.replaced = 0
+        self.creation_failures = 0
+
+    async def start(self) -> None:
+        """
+        Create every client up front; slots that fail are retried on first use
+        """
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            try:
+                client = await self._create()
+            except Exception as e:
+                logger.warning("Could not create upstream client at startup", extra={"error": str(e)})
+                client = None
+            self._idle.put_nowait(client)
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        Borrow a client for the duration of the block
+        """
+        if self._idle is None:
+            await self.start()
+
+        client = await self._idle.get()
+        try:
+            if client is not None and not self._is_healthy(client):
+                self._close(client)
+                self.replaced += 1
+                client = None
+            if client is None:
+                client = await self._create()
+            yield client
+        except Exception as e:
+            # Drop the client if the failure was its own; the slot is rebuilt on its next use
+            if client is not None and (isinstance(e, CHANNEL_ERRORS) or not self._is_healthy(client)):
+                self._close(client)
+                self.replaced += 1
+                client = None
+            raise
+        finally:
+            self._idle.put_nowait(client)
+
+    async def health_check(self) -> int:
+        """
+        Rebuild idle clients whose channel has died; returns how many were replaced
+        """
+        if self._idle is None:
+            return 0
+
+        replaced = 0
+        for _ in range(self._idle.qsize()):
+            client = self._idle.get_nowait()
+            if client is not None and self._is_healthy(client):
+                self._idle.put_nowait(client)
+                continue
+
+            if client is not None:
+                self._close(client)
+                self.replaced += 1
+            try:
+                client = await self._create()
+                replaced += 1
+            except Exception as e:
+                logger.warning("Upstream client health check could not rebuild a client", extra={"error": str(e)})
+                client = None
+            self._idle.put_nowait(client)
+        return replaced
+
+    async def run_health_checks(self, interval_seconds: float) -> None:
+        """
+        Run health_check every interval_seconds until cancelled
+        """
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.health_check()
+            except Exception as e:
+                logger.warning("Upstream client health check failed", extra={"error": str(e)})
+
+    def close(self) -> None:
+        """
+        Close every client the pool has created
+        """
+        for client in self._clients:
+            self._close(client)
+        self._clients = []
+        self._idle = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "created": self.created,
+            "replaced": self.replaced,
+            "creation_failures": self.creation_failures,
+        }
+
+    async def _create(self) -> Any:
+        try:
+            client = await self.executor.run(self.factory)
+        except Exception:
+            self.creation_failures += 1
+            raise
+        self.created += 1
+        self._clients.append(client)
+        return client
+
+    def _is_healthy(self, client: Any) -> bool:
+        transport = getattr(client, "transport", None)
+        channel = getattr(transport, "grpc_channel", None)
+        raw_channel = getattr(channel, "_channel", None)
+        # grpc exposes no public "is closed" check; a closed channel's
+        # connectivity check raises ValueError
+        if raw_channel is not None and hasattr(raw_channel, "check_connectivity_state"):
+            try:
+                raw_channel.check_connectivity_state(False)
+            except ValueError:
+                return False
+        return True
+
+    def _close(self, client: Any) -> None:
+        if client in self._clients:
+            self._clients.remove(client)
+        try:
+            client.transport.close()
+        except Exception:
+            pass
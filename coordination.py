@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from singleflight import SingleFlight
+from upstream import BoundedExecutor
+
+try:
+    import redis
+except ImportError:  # Optional: only needed for COORDINATION_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Compare-and-delete, so a worker never releases a lease another worker has taken over
+REDIS_RELEASE = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+
+
+class SQLiteLeases:
+    """
+    Expiring named leases in a SQLite file shared by every worker on the host.
+    A lease left behind by a crashed worker is free again once it expires.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def acquire(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.expires_at < ?",
+                (key, self.owner, now + ttl, now),
+            )
+            return cursor.rowcount == 1
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+
+    def held(self, key: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM leases WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+            return row is not None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisLeases:
+    """
+    Expiring named leases in Redis, for workers spread over several hosts
+    """
+
+    def __init__(self, url: str, prefix: str = "voice:lease:"):
+        if redis is None:
+            raise RuntimeError("COORDINATION_BACKEND=redis requires the redis package")
+        self.prefix = prefix
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._client = redis.Redis.from_url(url, socket_timeout=1.0)
+        self._release = self._client.register_script(REDIS_RELEASE)
+
+    def acquire(self, key: str, ttl: float) -> bool:
+        return bool(self._client.set(self.prefix + key, self.owner, nx=True, px=int(ttl * 1000)))
+
+    def release(self, key: str) -> None:
+        self._release(keys=[self.prefix + key], args=[self.owner])
+
+    def held(self, key: str) -> bool:
+        return bool(self._client.exists(self.prefix + key))
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def create_leases(backend: str, db_path: str, redis_url: Optional[str] = None):
+    """
+    Lease store for COORDINATION_BACKEND, or None when workers are not coordinated
+    """
+    if backend == "sqlite":
+        return SQLiteLeases(db_path)
+    if backend == "redis":
+        return RedisLeases(redis_url or "redis://localhost:6379/0")
+    if backend not in ("", "none"):
+        raise ValueError(f"Unknown coordination backend: {backend}")
+    return None
+
+
+class CoordinatedSingleFlight(SingleFlight):
+    """
+    SingleFlight that also coalesces across worker processes.
+
+    Calls for a key are first coalesced within the worker. The worker then takes a
+    lease on the key before calling upstream; a worker that finds the lease taken
+    polls `lookup` (the shared cache the leader writes to) until the result
+    appears or the lease is gone, and only then makes the call itself. Leases
+    expire after lease_seconds, so a crashed leader delays others by at most that.
+
+    Lease operations and lookups block (SQLite, Redis, disk), so they run on
+    `executor`, which should not be shared with slow upstream calls.
+    """
+
+    def __init__(self, name: str, leases, lookup: Callable[[Hashable], Optional[Any]],
+                 executor: BoundedExecutor, lease_seconds: float = 30.0, poll_interval: float = 0.05):
+        super().__init__()
+        self.name = name
+        self.leases = leases
+        self.lookup = lookup
+        self.executor = executor
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.led = 0
+        self.followed = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        return await super().do(key, lambda: self._coordinated(key, fn))
+
+    async def wait_remote(self, key: Hashable) -> Optional[Any]:
+        """
+        Wait for a call another worker holds the lease for; None if no worker is making it
+        """
+        lease = f"{self.name}:{key}"
+        if not await self.executor.run(self.leases.held, lease):
+            return None
+        self.followed += 1
+        return await self._follow(key, lease)
+
+    async def _coordinated(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        lease = f"{self.name}:{key}"
+        while True:
+            if await self.executor.run(self.leases.acquire, lease, self.lease_seconds):
+                self.led += 1
+                try:
+                    # Another worker may have finished between our cache miss and the lease
+                    result = await self.executor.run(self.lookup, key)
+                    return result if result is not None else await fn()
+                finally:
+                    await self.executor.run(self.leases.release, lease)
+
+            self.followed += 1
+            result = await self._follow(key, lease)
+            if result is not None:
+                return result
+
+    async def _follow(self, key: Hashable, lease: str) -> Optional[Any]:
+        # Poll until the leader's result is cached or its lease is released or expires
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            result = await self.executor.run(self.lookup, key)
+            if result is not None:
+                return result
+            if not await self.executor.run(self.leases.held, lease):
+                # The leader may have stored its result just before releasing
+                return await self.executor.run(self.lookup, key)
+
+    def stats(self) -> Dict[str, int]:
+        stats = super().stats()
+        stats.update({"led": self.led, "followed": self.followed})
+        return stats
@@ -0,0 +1,202 @@
+import heapq
+import json
+import logging
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS_PATH = "data/fallback_quotes.json"
+
+# Served when nothing in the corpus matches (or no corpus could be loaded)
+DEFAULT_QUOTES = [
+    {"quote": "Success is not final, failure is not fatal: it is the courage to continue that counts.", "context": "Winston Churchill"},
+    {"quote": "The way to get started is to quit talking and begin doing.", "context": "Walt Disney"},
+    {"quote": "Don't be afraid to give up the good to go for the great.", "context": "John D. Rockefeller"},
+]
+
+# Author tokens outrank topic tokens, which outrank words of the quote itself,
+# so "einstein imagination" returns Einstein first
+AUTHOR_WEIGHT = 3.0
+TOPIC_WEIGHT = 2.0
+TEXT_WEIGHT = 1.0
+# Misspelled tokens: the indexed tokens sharing the most trigrams are shortlisted,
+# then kept if their edit-distance similarity is at least FUZZY_THRESHOLD
+FUZZY_SHORTLIST = 10
+FUZZY_THRESHOLD = 0.75
+FUZZY_CANDIDATES = 3
+# Candidates considered per returned quote when spreading results across authors
+DIVERSITY_WINDOW = 8
+
+STOPWORDS = frozenset({
+    "a", "about", "after", "all", "am", "an", "and", "any", "are", "as", "at", "be", "been", "but", "by",
+    "can", "do", "does", "don", "for", "from", "had", "has", "have", "he", "her", "him", "his", "how",
+    "if", "in", "into", "is", "it", "its", "just", "ll", "me", "more", "most", "my", "no", "not", "of",
+    "on", "one", "only", "or", "our", "re", "she", "so", "than", "that", "the", "their", "them", "then",
+    "there", "they", "this", "those", "to", "too", "us", "ve", "was", "we", "were", "what", "when",
+    "which", "who", "will", "with", "would", "you", "your",
+    "quote", "quotes", "saying", "sayings",
+})
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase, accent-free word tokens of two or more characters,
+    e.g. "Gödel's Theorem" -> ["godel", "theorem"]
+    """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    folded = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return [token for token in TOKEN_PATTERN.findall(folded) if len(token) > 1]
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: Optional[int] = None) -> int:
+    """
+    Optimal string alignment distance: insertions, deletions, substitutions and adjacent transpositions.
+    Stops early and returns limit + 1 once the distance must exceed limit.
+    """
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class FallbackCorpus:
+    """
+    Offline quotes served when Gemini is unavailable, indexed once at load time.
+
+    Each entry has a quote, an author and a list of topics. Author-name, topic and
+    quote-text tokens go into one inverted index, weighted in that order; query
+    tokens that are not in it are matched to the closest indexed tokens by trigram
+    similarity, so "einstien" or "motivational" still find something relevant.
+    """
+
+    def __init__(self, entries: Iterable[Dict[str, any]]):
+        self.quotes: List[Dict[str, str]] = []
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+
+        for entry in entries:
+            entry_id = len(self.quotes)
+            self.quotes.append({"quote": entry["quote"], "context": entry["author"]})
+            # A token's weight for an entry adds up over the fields it appears in
+            fields = (
+                (entry["author"], AUTHOR_WEIGHT),
+                (" ".join(entry.get("topics", [])), TOPIC_WEIGHT),
+                (entry["quote"], TEXT_WEIGHT),
+            )
+            for text, weight in fields:
+                for token in set(tokenize(text)) - STOPWORDS:
+                    postings = self._postings.setdefault(token, {})
+                    postings[entry_id] = postings.get(entry_id, 0.0) + weight
+
+        for token in self._postings:
+            for gram in trigrams(token):
+                self._trigrams.setdefault(gram, set()).add(token)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_CORPUS_PATH) -> "FallbackCorpus":
+        """
+        Load a JSON list of {"quote", "author", "topics"} entries; an unreadable file gives an empty corpus
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load fallback quote corpus", extra={"path": path, "error": str(e)})
+            entries = []
+        corpus = cls(entries)
+        logger.info("Loaded fallback quote corpus", extra={"path": path, "quotes": len(corpus.quotes), "tokens": len(corpus._postings)})
+        return corpus
+
+    def search(self, subject: str, limit: int = 3) -> List[Dict[str, str]]:
+        """
+        Best matching quotes for subject, padded with DEFAULT_QUOTES up to limit
+        """
+        scores: Dict[int, float] = {}
+        for token in tokenize(subject):
+            if token in STOPWORDS:
+                continue
+            # Each query token contributes its best match to an entry
+            contributions: Dict[int, float] = {}
+            for match, similarity in self._matches(token):
+                for entry_id, weight in self._postings[match].items():
+                    score = weight * similarity
+                    if score > contributions.get(entry_id, 0.0):
+                        contributions[entry_id] = score
+            for entry_id, score in contributions.items():
+                scores[entry_id] = scores.get(entry_id, 0.0) + score
+
+        # Highest score first; among equal scores prefer authors not picked yet, then corpus order
+        ranked = heapq.nsmallest(limit * DIVERSITY_WINDOW, scores.items(), key=lambda item: (-item[1], item[0]))
+        picked: List[int] = []
+        authors: Set[str] = set()
+        while ranked and len(picked) < limit:
+            top_score = ranked[0][1]
+            tied = [entry_id for entry_id, score in ranked if score == top_score]
+            ranked = ranked[len(tied):]
+            # One quote per new author first, then the rest of the tie
+            first, rest = [], []
+            for entry_id in tied:
+                author = self.quotes[entry_id]["context"]
+                if author in authors:
+                    rest.append(entry_id)
+                else:
+                    authors.add(author)
+                    first.append(entry_id)
+            picked.extend((first + rest)[:limit - len(picked)])
+
+        results = [dict(self.quotes[entry_id]) for entry_id in picked]
+        # Few or no matches (e.g. a single quote by the subject) still fill the response
+        for quote in DEFAULT_QUOTES:
+            if len(results) >= limit:
+                break
+            if quote not in results:
+                results.append(dict(quote))
+        return results
+
+    def _matches(self, token: str) -> List[Tuple[str, float]]:
+        """
+        Indexed tokens matching token with their similarity: itself if indexed,
+        otherwise the closest few by edit distance among those sharing trigrams
+        """
+        if token in self._postings:
+            return [(token, 1.0)]
+        if len(token) < 4:
+            return []
+
+        grams = trigrams(token)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigrams.get(gram, ()))
+
+        candidates = []
+        for candidate, count in shared.most_common(FUZZY_SHORTLIST):
+            longest = max(len(token), len(candidate))
+            max_distance = int((1 - FUZZY_THRESHOLD) * longest)
+            # A single edit changes at most three trigrams, so fewer shared ones rule a candidate out
+            if abs(len(candidate) - len(token)) > max_distance or count < len(grams) - 3 * max_distance:
+                continue
+            similarity = 1 - edit_distance(token, candidate, max_distance) / longest
+            if similarity >= FUZZY_THRESHOLD:
+                candidates.append((candidate, similarity))
+        return heapq.nlargest(FUZZY_CANDIDATES, candidates, key=lambda item: (item[1], item[0]))
+
+    def __len__(self) -> int:
+        return len(self.quotes)
@@ -0,0 +1,22 @@
+"""
+Multi-worker deployment: gunicorn -c gunicorn.conf.py app:app
+
+Each worker is a separate process running its own event loop. Quote, audio
+and settings caches live in SQLite/files that every worker shares, and
+identical upstream calls are coalesced across workers with leases
+(COORDINATION_BACKEND, SQLite by default, or Redis with REDIS_URL).
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Streaming responses (quotes, chunked TTS) can legitimately run for a while
+timeout = int(os.getenv("WORKER_TIMEOUT_SECONDS", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+# Read by app.py when each worker imports it
+os.environ.setdefault("COORDINATION_BACKEND", "sqlite")
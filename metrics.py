@@ -0,0 +1,259 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count, optionally split by labels
+    """
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """
+    Value that goes up and down, optionally split by labels
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram, e.g. for latencies and response sizes
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    Collection of metrics rendered in the Prometheus text exposition format.
+    Collectors are callables returning (name, help, value) gauges computed at scrape time.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, float]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, float]]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, help_text, value in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "voice_http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")))
+HTTP_RESPONSE_BYTES = REGISTRY.register(Histogram(
+    "voice_http_response_bytes", "HTTP response body size by route", ("method", "route"), buckets=SIZE_BUCKETS))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "voice_http_requests_in_flight", "HTTP requests currently being served"))
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "voice_stage_duration_seconds", "Time spent in each stage of the request path", ("stage",)))
+FALLBACKS = REGISTRY.register(Counter(
+    "voice_fallbacks_total", "Responses served from a fallback instead of the upstream", ("kind",)))
+QUOTES_STREAM_FIRST_QUOTE = REGISTRY.register(Histogram(
+    "voice_quotes_stream_first_quote_seconds", "Time from request to the first streamed quote"))
+CIRCUIT_STATE = REGISTRY.register(Gauge(
+    "voice_circuit_breaker_state", "Circuit breaker state per upstream (0 closed, 1 half-open, 2 open)", ("upstream",)))
+CIRCUIT_TRANSITIONS = REGISTRY.register(Counter(
+    "voice_circuit_breaker_transitions_total", "Circuit breaker state changes per upstream", ("upstream", "state")))
+UPSTREAM_RETRIES = REGISTRY.register(Counter(
+    "voice_upstream_retries_total", "Upstream calls retried after a transient failure", ("upstream",)))
+
+
+def stage(name: str):
+    """
+    Time a block as one stage of the request path, e.g. `with stage("tts_synthesis"):`
+    """
+    return STAGE_DURATION.time(stage=name)
+
+
+def route_label(scope: dict, routes: Iterable) -> str:
+    """
+    Route template for a served request, bounded to the app's routes to keep label cardinality low
+    """
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        # Nothing matched; routes without an endpoint attribute (mounts) must not claim it
+        return "unmatched"
+    for candidate in routes:
+        if getattr(candidate, "endpoint", None) is endpoint or getattr(candidate, "app", None) is endpoint:
+            return candidate.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, response size and in-flight requests per route.
+    Implemented at the ASGI level so streaming responses pass straight through.
+    """
+
+    def __init__(self, app, routes_provider: Optional[Callable[[], Iterable]] = None):
+        self.app = app
+        self.routes_provider = routes_provider
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            routes = self.routes_provider() if self.routes_provider else ()
+            route = route_label(scope, routes)
+            method = scope.get("method", "")
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=method, route=route, status=str(status))
+            HTTP_RESPONSE_BYTES.observe(size, method=method, route=route)
@@ -0,0 +1,133 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from quotes import normalize_subject
+
+
+class QuoteCache:
+    """
+    SQLite-backed cache of generated quote results keyed on the normalized subject.
+
+    Entries younger than ttl_seconds are fresh. Entries past the TTL but within
+    stale_seconds are still served while the caller refreshes them in the
+    background; anything older is treated as a miss.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: float = 24 * 3600, stale_seconds: float = 7 * 24 * 3600):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS quotes ("
+            "subject TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.skipped_fallbacks = 0
+
+    def get(self, subject: str, count: bool = True) -> Optional[Tuple[Dict[str, Any], bool]]:
+        """
+        Return (result, is_fresh) for subject, or None on a miss.
+        Lookups with count=False (e.g. by the cache warmer) are left out of the hit/miss counters.
+        """
+        key = normalize_subject(subject)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM quotes WHERE subject = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                if count:
+                    self.misses += 1
+                return None
+
+            age = time.time() - row[1]
+            if age > self.ttl_seconds + self.stale_seconds:
+                self._conn.execute("DELETE FROM quotes WHERE subject = ?", (key,))
+                if count:
+                    self.misses += 1
+                return None
+
+            is_fresh = age <= self.ttl_seconds
+            if count and is_fresh:
+                self.hits += 1
+            elif count:
+                self.stale_hits += 1
+            return json.loads(row[0]), is_fresh
+
+    def put(self, subject: str, result: Dict[str, Any]) -> bool:
+        """
+        Store a generated result. Fallback results are refused so they are never
+        served as if they came from the model.
+        """
+        if result.get("is_fallback"):
+            with self._lock:
+                self.skipped_fallbacks += 1
+            return False
+
+        key = normalize_subject(subject)
+        payload = json.dumps({"quotes": result["quotes"], "is_person": result["is_person"]})
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO quotes (subject, result, created_at) VALUES (?, ?, ?)",
+                (key, payload, time.time()),
+            )
+            self.stores += 1
+        return True
+
+    def purge(self, subject: Optional[str] = None) -> int:
+        """
+        Remove one subject, or every entry when subject is None; returns the number removed
+        """
+        with self._lock:
+            if subject is None:
+                cursor = self._conn.execute("DELETE FROM quotes")
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM quotes WHERE subject = ?", (normalize_subject(subject),)
+                )
+            return cursor.rowcount
+
+    def subjects(self) -> List[str]:
+        """
+        Normalized subjects currently stored
+        """
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT subject FROM quotes ORDER BY subject")]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit-rate counters and entry count
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM quotes").fetchone()[0]
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "skipped_fallbacks": self.skipped_fallbacks,
+                "entries": entries,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,30 +1,324 @@
 import google.generativeai as genai
 import json
-from typing import List, Dict
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import List, Dict, Iterator, Optional
+
+from metrics import FALLBACKS, stage
+from resilience import CircuitBreaker, Deadline, RetryPolicy, call_with_retry, record_error
+from fallback_corpus import FallbackCorpus
+
+logger = logging.getLogger(__name__)
+
+QUOTE_ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "quote": {"type": "string"},
+        "context": {"type": "string"},
+    },
+    "required": ["quote", "context"],
+}
+
+QUOTES_LIST_SCHEMA = {
+    "type": "array",
+    "items": QUOTE_ITEM_SCHEMA,
+}
+
+# Person check and quotes in a single structured response
+QUOTES_RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "is_person": {"type": "boolean"},
+        "quotes": QUOTES_LIST_SCHEMA,
+    },
+    "required": ["is_person", "quotes"],
+}
+
+def normalize_subject(subject: str) -> str:
+    """
+    Canonical form of a subject so "Einstein", "einstein " and full-width variants match
+    """
+    return " ".join(unicodedata.normalize("NFKC", subject).casefold().split())
+
+class QuoteStreamParser:
+    """
+    Incremental parser for a streamed quotes response.
+
+    Text is fed in arbitrary chunks; every {"quote", "context"} object that sits
+    inside a JSON array is returned as soon as its closing brace arrives, without
+    waiting for the rest of the document.
+    """
+    
+    IS_PERSON_PATTERN = re.compile(r'"is_person"\s*:\s*(true|false)')
+    
+    def __init__(self):
+        self.buffer = ""
+        self.is_person: Optional[bool] = None
+        self._position = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._object_start: Optional[int] = None
+        self._object_depth = 0
+    
+    def feed(self, text: str) -> List[Dict[str, str]]:
+        """
+        Consume the next chunk and return the quotes it completed
+        """
+        self.buffer += text
+        quotes = []
+        
+        for i in range(self._position, len(self.buffer)):
+            char = self.buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if char == "{" and self._object_start is None and self._stack and self._stack[-1] == "[":
+                    self._object_start = i
+                    self._object_depth = len(self._stack)
+                self._stack.append(char)
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if char == "}" and self._object_start is not None and len(self._stack) == self._object_depth:
+                    quote = self._parse_quote(self.buffer[self._object_start:i + 1])
+                    if quote is not None:
+                        quotes.append(quote)
+                    self._object_start = None
+        self._position = len(self.buffer)
+        
+        if self.is_person is None:
+            match = self.IS_PERSON_PATTERN.search(self.buffer)
+            if match:
+                self.is_person = match.group(1) == "true"
+        
+        return quotes
+    
+    def _parse_quote(self, text: str) -> Optional[Dict[str, str]]:
+        try:
+            item = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(item, dict) or not isinstance(item.get("quote"), str) or not isinstance(item.get("context"), str):
+            return None
+        return {"quote": item["quote"], "context": item["context"]}
 
 class QuotesGenerator:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, single_call: bool = True, person_cache_size: int = 1024,
+                 breaker: Optional[CircuitBreaker] = None, retry_policy: Optional[RetryPolicy] = None,
+                 deadline_seconds: float = 20.0, fallback_corpus: Optional[FallbackCorpus] = None):
         # Initialize Gemini with provided API key
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        self.single_call = single_call
+        
+        # Every Gemini call gets a timeout from the request's deadline, transient
+        # failures are retried, and an open breaker goes straight to the fallback
+        self.breaker = breaker or CircuitBreaker("gemini")
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.deadline_seconds = deadline_seconds
+        
+        # Indexed once here; the fallback is what users get while Gemini is down
+        self.fallback_corpus = fallback_corpus or FallbackCorpus.load()
+        
+        # Person/not-person decisions per normalized subject
+        self.person_cache_size = person_cache_size
+        self._person_cache: "OrderedDict[str, bool]" = OrderedDict()
+        self._person_cache_lock = threading.Lock()
     
-    def generate_quotes(self, subject: str) -> Dict[str, any]:
+    def generate_quotes(self, subject: str, deadline: Optional[Deadline] = None) -> Dict[str, any]:
         """
         Generate quotes for a given subject using Gemini 2.5 Flash Lite
-        Returns a dictionary with 'quotes' (list of quote dictionaries) and 'is_person' (boolean) keys
+        Returns a dictionary with 'quotes' (list of quote dictionaries) and 'is_person' (boolean) keys,
+        plus 'is_fallback' (boolean) when the canned fallback quotes were used
+        """
+        deadline = deadline or Deadline(self.deadline_seconds)
+        if self.single_call:
+            return self._generate_quotes_single_call(subject, deadline)
+        return self._generate_quotes_two_calls(subject, deadline)
+    
+    def _call_model(self, prompt: str, deadline: Deadline, generation_config: Optional[Dict[str, any]] = None):
+        """
+        generate_content with a per-attempt timeout, retries and the circuit breaker
+        """
+        def attempt(timeout: float):
+            # The client library's own retries are disabled so attempts all come from retry_policy
+            request_options = {"timeout": timeout, "retry": None}
+            if generation_config:
+                return self.model.generate_content(
+                    prompt, generation_config=generation_config, request_options=request_options)
+            return self.model.generate_content(prompt, request_options=request_options)
+        
+        return call_with_retry(attempt, self.breaker, self.retry_policy, deadline)
+    
+    def _generate_quotes_single_call(self, subject: str, deadline: Deadline) -> Dict[str, any]:
+        """
+        Ask for the person decision and the quotes in one structured JSON response
+        """
+        prompt = self._single_call_prompt(subject)
+        
+        try:
+            with stage("quote_generation"):
+                response = self._call_model(
+                    prompt,
+                    deadline,
+                    generation_config={
+                        "response_mime_type": "application/json",
+                        "response_schema": QUOTES_RESULT_SCHEMA,
+                    },
+                )
+            with stage("json_parse"):
+                result = json.loads(response.text)
+            if not isinstance(result, dict) or not isinstance(result.get("is_person"), bool):
+                raise ValueError("Response is not a result object")
+            
+            is_person = result["is_person"]
+            self._remember_is_person(subject, is_person)
+            return {"quotes": self._validate_quotes(result.get("quotes")), "is_person": is_person, "is_fallback": False}
+        
+        except Exception as e:
+            logger.warning("Error generating quotes", extra={"error": str(e)})
+            is_person = self._cached_is_person(subject)
+            return {"quotes": self._get_fallback_quotes(subject), "is_person": bool(is_person), "is_fallback": True}
+    
+    def _single_call_prompt(self, subject: str) -> str:
+        """
+        Prompt asking for the person decision and the quotes as one JSON object
         """
-        # First, determine if the subject is a person's name
-        person_check_prompt = f"""
-        Determine if "{subject}" is the name of a person (famous person, historical figure, celebrity, author, etc.).
-        Respond with only "YES" if it's a person's name, or "NO" if it's not a person's name.
+        return f"""
+        First, determine if "{subject}" is the name of a person (famous person, historical figure, celebrity, author, etc.).
+        
+        If it is a person's name, generate 5 inspiring and meaningful quotes BY "{subject}" (quotes that this person actually said or wrote).
+        Make sure all quotes are actually attributed to "{subject}" and are authentic quotes by this person.
+        For each quote, provide the quote itself and context about when/where the quote was said.
+        
+        Otherwise, generate 5 inspiring and meaningful quotes about "{subject}".
+        Make sure the quotes are diverse, inspiring, and directly related to the subject "{subject}" and that they were actually spoken by someone and/or written in a document.
+        For each quote, provide the quote itself and context about the quote (who said it, when, or what situation it relates to).
+        
+        Return a JSON object with this structure:
+        {{
+            "is_person": true or false,
+            "quotes": [
+                {{
+                    "quote": "The actual quote text",
+                    "context": "Context about the quote"
+                }}
+            ]
+        }}
         """
+    
+    def stream_quotes(self, subject: str, deadline: Optional[Deadline] = None) -> Iterator[Dict[str, any]]:
+        """
+        Stream the single-call response, yielding events as soon as they can be parsed:
+        {"type": "meta", "is_person": bool}, then {"type": "quote", "quote": ..., "context": ...}
+        per quote, then {"type": "done", "is_fallback": bool}
+        """
+        parser = QuoteStreamParser()
+        is_person = None
+        emitted = 0
+        deadline = deadline or Deadline(self.deadline_seconds)
         
         try:
-            person_response = self.model.generate_content(person_check_prompt)
-            is_person = person_response.text.strip().upper() == "YES"
-        except Exception:
-            # If we can't determine, assume it's not a person
-            is_person = False
+            # Not retried: quotes may already have reached the client when a stream fails.
+            # The whole stream shares the request deadline.
+            timeout = deadline.timeout()
+            self.breaker.allow()
+            upstream_ok = None
+            upstream_error = None
+            try:
+                response = self.model.generate_content(
+                    self._single_call_prompt(subject),
+                    generation_config={
+                        "response_mime_type": "application/json",
+                        "response_schema": QUOTES_RESULT_SCHEMA,
+                    },
+                    stream=True,
+                    request_options={"timeout": timeout, "retry": None},
+                )
+                # Quotes are held back until is_person is known so the client can title the list first
+                pending = []
+                for chunk in response:
+                    pending.extend(parser.feed(chunk.text))
+                    if is_person is None and parser.is_person is not None:
+                        is_person = parser.is_person
+                        self._remember_is_person(subject, is_person)
+                        yield {"type": "meta", "is_person": is_person}
+                    if is_person is not None:
+                        for quote in pending:
+                            emitted += 1
+                            yield {"type": "quote", **quote}
+                        pending = []
+                upstream_ok = True
+            except Exception as e:
+                upstream_ok = False
+                upstream_error = e
+                raise
+            finally:
+                if upstream_ok:
+                    self.breaker.record_success()
+                elif upstream_ok is False:
+                    record_error(self.breaker, upstream_error)
+                else:
+                    # The consumer went away mid-stream
+                    self.breaker.release_trial()
+            
+            if is_person is None:
+                is_person = bool(self._cached_is_person(subject))
+                yield {"type": "meta", "is_person": is_person}
+            for quote in pending:
+                emitted += 1
+                yield {"type": "quote", **quote}
+            
+            if emitted == 0:
+                raise ValueError("Response contained no quotes")
+            
+            yield {"type": "done", "is_fallback": False}
+        
+        except Exception as e:
+            logger.warning("Error streaming quotes", extra={"error": str(e)})
+            if emitted:
+                # Keep what was already delivered rather than mixing in fallback quotes
+                yield {"type": "done", "is_fallback": False, "complete": False}
+                return
+            
+            if is_person is None:
+                is_person = bool(self._cached_is_person(subject))
+                yield {"type": "meta", "is_person": is_person}
+            for quote in self._get_fallback_quotes(subject):
+                yield {"type": "quote", **quote}
+            yield {"type": "done", "is_fallback": True}
+    
+    def _generate_quotes_two_calls(self, subject: str, deadline: Deadline) -> Dict[str, any]:
+        """
+        Legacy flow: a YES/NO person check followed by a second call for the quotes
+        """
+        is_person = self._cached_is_person(subject)
+        if is_person is None:
+            # First, determine if the subject is a person's name
+            person_check_prompt = f"""
+            Determine if "{subject}" is the name of a person (famous person, historical figure, celebrity, author, etc.).
+            Respond with only "YES" if it's a person's name, or "NO" if it's not a person's name.
+            """
+            
+            try:
+                with stage("person_check"):
+                    person_response = self._call_model(person_check_prompt, deadline)
+                is_person = person_response.text.strip().upper() == "YES"
+                self._remember_is_person(subject, is_person)
+            except Exception:
+                # If we can't determine, assume it's not a person
+                is_person = False
         
         if is_person:
             prompt = f"""
@@ -58,96 +352,64 @@ class QuotesGenerator:
             """
         
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
+            with stage("quote_generation"):
+                response = self._call_model(
+                    prompt,
+                    deadline,
+                    generation_config={
+                        "response_mime_type": "application/json",
+                        "response_schema": QUOTES_LIST_SCHEMA,
+                    },
+                )
+            with stage("json_parse"):
+                quotes_data = self._validate_quotes(json.loads(response.text))
+            return {"quotes": quotes_data, "is_person": is_person, "is_fallback": False}
             
-            # Clean up the response to extract JSON
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
-            
-            # Parse JSON response
-            quotes_data = json.loads(response_text)
-            
-            # Validate the structure
-            if not isinstance(quotes_data, list):
-                raise ValueError("Response is not a list")
-            
-            for item in quotes_data:
-                if not isinstance(item, dict) or 'quote' not in item or 'context' not in item:
-                    raise ValueError("Invalid quote structure")
-            
-            return {"quotes": quotes_data, "is_person": is_person}
-            
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error: {e}")
-            print(f"Response text: {response_text}")
-            fallback_quotes = self._get_fallback_quotes(subject)
-            return {"quotes": fallback_quotes, "is_person": is_person}
         except Exception as e:
-            print(f"Error generating quotes: {e}")
+            logger.warning("Error generating quotes", extra={"error": str(e)})
             fallback_quotes = self._get_fallback_quotes(subject)
-            return {"quotes": fallback_quotes, "is_person": is_person}
+            return {"quotes": fallback_quotes, "is_person": is_person, "is_fallback": True}
     
-    def _get_fallback_quotes(self, subject: str) -> List[Dict[str, str]]:
+    def _validate_quotes(self, quotes_data) -> List[Dict[str, str]]:
         """
-        Fallback quotes if Gemini API fails
-        """
-        # Check if subject might be a person's name (simple heuristic)
-        subject_lower = subject.lower()
-        
-        # Common person names that might be searched
-        person_quotes = {
-            "einstein": [
-                {"quote": "Imagination is more important than knowledge.", "context": "Albert Einstein"},
-                {"quote": "The important thing is not to stop questioning.", "context": "Albert Einstein"},
-                {"quote": "Try not to become a person of success, but rather try to become a person of value.", "context": "Albert Einstein"}
-            ],
-            "churchill": [
-                {"quote": "Success is not final, failure is not fatal: it is the courage to continue that counts.", "context": "Winston Churchill"},
-                {"quote": "We shall never surrender.", "context": "Winston Churchill"},
-                {"quote": "If you're going through hell, keep going.", "context": "Winston Churchill"}
-            ],
-            "jobs": [
-                {"quote": "The only way to do great work is to love what you do.", "context": "Steve Jobs"},
-                {"quote": "Stay hungry, stay foolish.", "context": "Steve Jobs"},
-                {"quote": "Innovation distinguishes between a leader and a follower.", "context": "Steve Jobs"}
-            ],
-            "disney": [
-                {"quote": "If you can dream it, you can do it.", "context": "Walt Disney"},
-                {"quote": "The way to get started is to quit talking and begin doing.", "context": "Walt Disney"},
-                {"quote": "All our dreams can come true, if we have the courage to pursue them.", "context": "Walt Disney"}
-            ]
-        }
-        
-        # Check if subject matches any person names
-        for person_name in person_quotes:
-            if person_name in subject_lower:
-                return person_quotes[person_name]
-        
-        # General topic quotes
-        topic_quotes = {
-            "success": [
-                {"quote": "Success is not final, failure is not fatal: it is the courage to continue that counts.", "context": "Winston Churchill"},
-                {"quote": "The way to get started is to quit talking and begin doing.", "context": "Walt Disney"},
-                {"quote": "Don't be afraid to give up the good to go for the great.", "context": "John D. Rockefeller"}
-            ],
-            "motivation": [
-                {"quote": "The only way to do great work is to love what you do.", "context": "Steve Jobs"},
-                {"quote": "If you can dream it, you can do it.", "context": "Walt Disney"},
-                {"quote": "The future belongs to those who believe in the beauty of their dreams.", "context": "Eleanor Roosevelt"}
-            ],
-            "life": [
-                {"quote": "Life is what happens to you while you're busy making other plans.", "context": "John Lennon"},
-                {"quote": "The purpose of our lives is to be happy.", "context": "Dalai Lama"},
-                {"quote": "Get busy living or get busy dying.", "context": "Stephen King"}
-            ]
-        }
+        Check the parsed quotes have the expected structure
+        """
+        if not isinstance(quotes_data, list):
+            raise ValueError("Response is not a list")
         
-        # Return quotes based on subject or default to success quotes
-        for key in topic_quotes:
-            if key in subject_lower:
-                return topic_quotes[key]
+        for item in quotes_data:
+            if not isinstance(item, dict) or 'quote' not in item or 'context' not in item:
+                raise ValueError("Invalid quote structure")
         
-        return topic_quotes["success"]
\ No newline at end of file
+        return quotes_data
+    
+    def _cached_is_person(self, subject: str) -> Optional[bool]:
+        """
+        Previously decided person/not-person answer for subject, if any
+        """
+        if self.person_cache_size <= 0:
+            return None
+        key = normalize_subject(subject)
+        with self._person_cache_lock:
+            is_person = self._person_cache.get(key)
+            if is_person is not None:
+                self._person_cache.move_to_end(key)
+            return is_person
+    
+    def _remember_is_person(self, subject: str, is_person: bool) -> None:
+        if self.person_cache_size <= 0:
+            return
+        key = normalize_subject(subject)
+        with self._person_cache_lock:
+            self._person_cache[key] = is_person
+            self._person_cache.move_to_end(key)
+            while len(self._person_cache) > self.person_cache_size:
+                self._person_cache.popitem(last=False)
+    
+    def _get_fallback_quotes(self, subject: str) -> List[Dict[str, str]]:
+        """
+        Fallback quotes if Gemini API fails, looked up in the offline corpus
+        """
+        FALLBACKS.inc(kind="fallback_quotes")
+        with stage("fallback_lookup"):
+            return self.fallback_corpus.search(subject)
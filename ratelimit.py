@@ -0,0 +1,201 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+
+class Overloaded(Exception):
+    """
+    Raised when a request is rejected by admission control; carries the Retry-After hint
+    """
+
+    def __init__(self, message: str, retry_after: float, status_code: int = 503):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, holding at most `burst`
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def try_acquire(self, now: Optional[float] = None) -> float:
+        """
+        Take one token; returns 0 on success, otherwise seconds until a token is available
+        """
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (1 - self.tokens) / self.rate
+
+
+class ClientRateLimiter:
+    """
+    Per-client token buckets, keeping at most max_clients buckets (least recently seen are dropped)
+    """
+
+    def __init__(self, rate: float = 5.0, burst: float = 20.0, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    def check(self, client: str) -> None:
+        """
+        Raise Overloaded (429) if client has exhausted its bucket
+        """
+        if self.rate <= 0:
+            return
+
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[client] = bucket
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+                bucket.rate = self.rate
+                bucket.burst = self.burst
+
+            wait = bucket.try_acquire()
+            if wait:
+                self.rejected += 1
+                raise Overloaded("Rate limit exceeded", retry_after=wait, status_code=429)
+            self.allowed += 1
+
+    def configure(self, rate: Optional[float] = None, burst: Optional[float] = None) -> None:
+        with self._lock:
+            if rate is not None:
+                self.rate = rate
+            if burst is not None:
+                self.burst = burst
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "clients": len(self._buckets),
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+            }
+
+
+class UpstreamBudget:
+    """
+    Concurrency budget for one upstream (e.g. Gemini text, Cloud TTS).
+
+    At most max_concurrency calls hold a slot; up to max_queue more wait in FIFO
+    order and anything beyond that is rejected immediately with Overloaded. Both
+    limits can be changed at runtime.
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 8, max_queue: int = 32, retry_after: float = 1.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+
+    async def acquire(self) -> None:
+        """
+        Take a slot, waiting in the queue if needed; raises Overloaded when the queue is full
+        """
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(f"{self.name} is at capacity", retry_after=self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us just as we were cancelled; pass it on
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        self.admitted += 1
+
+    def release(self) -> None:
+        """
+        Give a slot back, handing it straight to the next waiter if there is one
+        """
+        self.in_flight -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def configure(self, max_concurrency: Optional[int] = None, max_queue: Optional[int] = None) -> None:
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+        if max_queue is not None:
+            self.max_queue = max_queue
+            # Shed waiters beyond the new queue depth, newest first
+            while len(self._waiters) > self.max_queue:
+                waiter = self._waiters.pop()
+                self.rejected += 1
+                waiter.set_exception(Overloaded(f"{self.name} is at capacity", retry_after=self.retry_after))
+        self._wake()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.max_concurrency:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+
+def retry_after_header(seconds: float) -> str:
+    """
+    Retry-After value in whole seconds, at least 1
+    """
+    if math.isinf(seconds):
+        return "60"
+    return str(max(1, math.ceil(seconds)))
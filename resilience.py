@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from metrics import CIRCUIT_STATE, CIRCUIT_TRANSITIONS, UPSTREAM_RETRIES
+
+logger = logging.getLogger(__name__)
+
+# Transient upstream failures that are safe to retry: the request was rejected,
+# throttled or timed out without producing a result
+RETRYABLE_ERRORS = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.Aborted,
+    ConnectionError,
+    TimeoutError,
+)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when a request's upstream time budget runs out before a call can be made
+    """
+
+
+class CircuitOpen(Exception):
+    """
+    Raised instead of calling an upstream whose circuit breaker is open
+    """
+
+
+class Deadline:
+    """
+    Time budget for one request, shared by every upstream attempt it makes
+    """
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """
+        Timeout for the next attempt: what is left of the budget, at most cap.
+        Raises DeadlineExceeded if nothing is left.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("Upstream deadline exceeded")
+        return min(remaining, cap) if cap else remaining
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: attempt n waits uniformly in [0, min(max_delay, base_delay * 2**n)]
+    """
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.2, max_delay: float = 2.0,
+                 attempt_timeout: Optional[float] = 10.0):
+        self.attempts = max(attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+
+    def delays(self) -> Iterator[float]:
+        for attempt in range(self.attempts - 1):
+            yield random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Per-upstream circuit breaker.
+
+    After failure_threshold consecutive failures the circuit opens and calls fail
+    immediately with CircuitOpen. Once reset_timeout has passed a single trial call
+    is let through (half-open); its success closes the circuit, its failure opens
+    it again. Thread-safe, since upstream calls run on executor threads.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.set(STATE_VALUES[CLOSED], upstream=name)
+
+    def allow(self) -> None:
+        """
+        Raise CircuitOpen unless a call may go through now
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.rejected += 1
+        raise CircuitOpen(f"{self.name} circuit is open")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._trial_in_flight = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def release_trial(self) -> None:
+        """
+        Let another half-open trial through after one ended without an outcome
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "state": STATE_VALUES[self.state],
+                "consecutive_failures": self.failures,
+                "rejected": self.rejected,
+            }
+
+    def _transition(self, state: str) -> None:
+        logger.warning("Circuit breaker state change", extra={"upstream": self.name, "from": self.state, "to": state})
+        self.state = state
+        CIRCUIT_STATE.set(STATE_VALUES[state], upstream=self.name)
+        CIRCUIT_TRANSITIONS.inc(upstream=self.name, state=state)
+
+
+def call_with_retry(fn: Callable[[float], Any], breaker: CircuitBreaker, policy: RetryPolicy,
+                    deadline: Deadline) -> Any:
+    """
+    Call fn(timeout) through the breaker, retrying transient failures with backoff
+    until the policy or the deadline runs out. For calls made on executor threads.
+    """
+    delays = policy.delays()
+    while True:
+        timeout = deadline.timeout(policy.attempt_timeout)
+        breaker.allow()
+        try:
+            result = fn(timeout)
+        except Exception as e:
+            record_error(breaker, e)
+            delay = _next_delay(e, delays, deadline, breaker.name)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
+
+
+async def call_with_retry_async(fn: Callable[[float], Awaitable[Any]], breaker: CircuitBreaker,
+                                policy: RetryPolicy, deadline: Deadline) -> Any:
+    """
+    Same as call_with_retry for calls awaited on the event loop
+    """
+    delays = policy.delays()
+    while True:
+        timeout = deadline.timeout(policy.attempt_timeout)
+        breaker.allow()
+        try:
+            result = await fn(timeout)
+        except asyncio.CancelledError:
+            # Not the upstream's fault; release a half-open trial without judging it
+            breaker.release_trial()
+            raise
+        except Exception as e:
+            record_error(breaker, e)
+            delay = _next_delay(e, delays, deadline, breaker.name)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
+
+
+def record_error(breaker: CircuitBreaker, error: Exception) -> None:
+    """
+    Count only upstream trouble (RETRYABLE_ERRORS) against the breaker. Errors caused by
+    the request itself, e.g. InvalidArgument for an unknown voice, say nothing about the
+    upstream's health, so they only release a half-open trial.
+    """
+    if isinstance(error, RETRYABLE_ERRORS):
+        breaker.record_failure()
+    else:
+        breaker.release_trial()
+
+
+def _next_delay(error: Exception, delays: Iterator[float], deadline: Deadline, name: str) -> Optional[float]:
+    """
+    Backoff before retrying error, or None if it should be raised
+    """
+    if not isinstance(error, RETRYABLE_ERRORS):
+        return None
+    delay = next(delays, None)
+    if delay is None or delay >= deadline.remaining():
+        return None
+    UPSTREAM_RETRIES.inc(upstream=name)
+    logger.info("Retrying upstream call", extra={"upstream": name, "error": str(error), "delay": round(delay, 3)})
+    return delay
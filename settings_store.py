@@ -0,0 +1,131 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Settings every user has, whether or not they saved any
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "voice_id": None,
+    "sound_effects": True,
+    "auto_tts": False,
+}
+
+
+class SettingsStore:
+    """
+    SQLite-backed per-user settings with an in-memory read-through LRU cache.
+
+    Reads are served from memory after the first lookup for a user (including
+    users with nothing saved); writes go to SQLite and update the cache. When
+    several worker processes share the database, a write by any other worker
+    clears this worker's cache (detected through SQLite's data_version).
+    """
+
+    def __init__(self, db_path: str, cache_size: int = 10000):
+        self.db_path = db_path
+        self.cache_size = cache_size
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS user_settings ("
+            "user_id TEXT PRIMARY KEY, settings TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        # None marks a user known to have no saved settings
+        self._cache: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self.invalidations = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def get(self, user_id: str) -> Dict[str, Any]:
+        """
+        Settings for user_id, with defaults for anything not saved
+        """
+        with self._lock:
+            saved = self._get_locked(user_id)
+        return {**DEFAULT_SETTINGS, **(saved or {})}
+
+    def voice_id(self, user_id: Optional[str]) -> Optional[str]:
+        """
+        The user's saved voice, if any
+        """
+        if not user_id:
+            return None
+        return self.get(user_id)["voice_id"]
+
+    def update(self, user_id: str, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merge changes into the user's saved settings and return the result
+        """
+        with self._lock:
+            saved = {**(self._get_locked(user_id) or {}), **changes}
+            self._conn.execute(
+                "INSERT OR REPLACE INTO user_settings (user_id, settings, updated_at) VALUES (?, ?, ?)",
+                (user_id, json.dumps(saved), time.time()),
+            )
+            self._remember(user_id, saved)
+            self.writes += 1
+        return {**DEFAULT_SETTINGS, **saved}
+
+    def delete(self, user_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM user_settings WHERE user_id = ?", (user_id,))
+            self._remember(user_id, None)
+            return cursor.rowcount > 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            users = self._conn.execute("SELECT COUNT(*) FROM user_settings").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "users": users,
+                "cached_users": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+                "invalidations": self.invalidations,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _get_locked(self, user_id: str) -> Optional[Dict[str, Any]]:
+        # data_version changes only when another connection commits
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self._cache.clear()
+            self.invalidations += 1
+
+        if user_id in self._cache:
+            self._cache.move_to_end(user_id)
+            self.hits += 1
+            return self._cache[user_id]
+
+        self.misses += 1
+        row = self._conn.execute("SELECT settings FROM user_settings WHERE user_id = ?", (user_id,)).fetchone()
+        saved = json.loads(row[0]) if row else None
+        self._remember(user_id, saved)
+        return saved
+
+    def _remember(self, user_id: str, saved: Optional[Dict[str, Any]]) -> None:
+        if self.cache_size <= 0:
+            return
+        self._cache[user_id] = saved
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
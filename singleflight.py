@@ -0,0 +1,148 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one upstream call.
+
+    The first caller for a key starts the work as a task; callers arriving while
+    it is running await the same task and receive the same result or exception.
+    A cancelled caller only stops waiting, the shared call keeps running for the
+    others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() for key, or join the call already in flight for key
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def pending(self, key: Hashable) -> Optional[asyncio.Task]:
+        """
+        The in-flight call for key, if any
+        """
+        return self._calls.get(key)
+
+    async def wait_remote(self, key: Hashable) -> Optional[Any]:
+        """
+        Result of a call for key running in another worker process; a
+        single-process SingleFlight has none, see CoordinatedSingleFlight
+        """
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Upstream calls started, requests that joined one, and calls in flight
+        """
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+
+class _Broadcast:
+    def __init__(self):
+        self.events: List[Any] = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.updated = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        self.updated.set()
+        self.updated = asyncio.Event()
+
+
+class StreamFlight:
+    """
+    Coalesces concurrent streams that share a key into one upstream stream.
+
+    The stream started for a key runs as a task and every event it yields is
+    kept, so a subscriber that joins late first replays what it missed and then
+    follows along; all subscribers see the same events in the same order. A
+    subscriber that goes away only stops reading, the stream keeps running for
+    the others.
+    """
+
+    def __init__(self):
+        self._streams: Dict[Hashable, _Broadcast] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def join(self, key: Hashable) -> Optional[AsyncIterator[Any]]:
+        """
+        Subscribe to the stream in flight for key, or None if there is none
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            return None
+        self.coalesced += 1
+        return self._subscribe(broadcast)
+
+    def start(self, key: Hashable, events: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """
+        Run events as the stream for key and subscribe to it
+        """
+        broadcast = _Broadcast()
+        self._streams[key] = broadcast
+        broadcast.task = asyncio.ensure_future(self._run(key, broadcast, events))
+        self.calls += 1
+        return self._subscribe(broadcast)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Upstream streams started, requests that joined one, and streams in flight
+        """
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._streams),
+        }
+
+    async def _run(self, key: Hashable, broadcast: _Broadcast, events: AsyncIterator[Any]) -> None:
+        try:
+            async for event in events:
+                broadcast.events.append(event)
+                broadcast.notify()
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            broadcast.done = True
+            broadcast.notify()
+            if self._streams.get(key) is broadcast:
+                del self._streams[key]
+
+    async def _subscribe(self, broadcast: _Broadcast) -> AsyncIterator[Any]:
+        index = 0
+        while True:
+            while index < len(broadcast.events):
+                index += 1
+                yield broadcast.events[index - 1]
+            if broadcast.done:
+                if broadcast.error is not None:
+                    raise broadcast.error
+                return
+            await broadcast.updated.wait()
@@ -12,7 +12,10 @@ document.addEventListener('DOMContentLoaded', function() {
 
 function loadToolbar() {
     const toolbarContainer = document.getElementById('toolbar-container');
-    if (toolbarContainer) {
+    // Pages served by the app already have the toolbar inlined
+    if (toolbarContainer && toolbarContainer.children.length > 0) {
+        highlightCurrentPage();
+    } else if (toolbarContainer) {
         fetch('/static/index.html')
             .then(response => response.text())
             .then(html => {
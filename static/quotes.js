@@ -6,6 +6,7 @@ class QuotesApp {
         this.quotesTitle = document.getElementById('quotesTitle');
         this.quotesList = document.getElementById('quotesList');
         this.errorMessage = document.getElementById('errorMessage');
+        this.playAllBtn = document.getElementById('playAllBtn');
         
         this.loadToolbar();
         this.initEventListeners();
@@ -13,7 +14,10 @@ class QuotesApp {
 
     loadToolbar() {
         const toolbarContainer = document.getElementById('toolbar-container');
-        if (toolbarContainer) {
+        // Pages served by the app already have the toolbar inlined
+        if (toolbarContainer && toolbarContainer.children.length > 0) {
+            this.highlightCurrentPage();
+        } else if (toolbarContainer) {
             fetch('/static/index.html')
                 .then(response => response.text())
                 .then(html => {
@@ -41,6 +45,7 @@ class QuotesApp {
 
     initEventListeners() {
         this.getQuotesBtn.addEventListener('click', () => this.handleGetQuotes());
+        this.playAllBtn.addEventListener('click', () => this.handlePlayAll());
         this.subjectInput.addEventListener('keypress', (e) => {
             if (e.key === 'Enter') {
                 this.handleGetQuotes();
@@ -61,8 +66,12 @@ class QuotesApp {
         this.hideQuotes();
 
         try {
-            const result = await this.fetchQuotes(subject);
-            this.displayQuotes(subject, result.quotes, result.is_person);
+            if (window.ReadableStream && window.TextDecoder) {
+                await this.streamQuotes(subject);
+            } else {
+                const result = await this.fetchQuotes(subject);
+                this.displayQuotes(subject, result.quotes, result.is_person, result.audio_urls);
+            }
         } catch (error) {
             this.showError(`Failed to fetch quotes: ${error.message}`);
         } finally {
@@ -76,7 +85,11 @@ class QuotesApp {
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ subject })
+            body: JSON.stringify({
+                subject,
+                prefetch_audio: true,
+                voice_id: this.getVoiceId()
+            })
         });
 
         if (!response.ok) {
@@ -85,26 +98,85 @@ class QuotesApp {
         }
 
         const data = await response.json();
-        return { quotes: data.quotes, is_person: data.is_person };
+        return { quotes: data.quotes, is_person: data.is_person, audio_urls: data.audio_urls };
+    }
+
+    async streamQuotes(subject) {
+        // Quotes arrive as newline-delimited JSON events and are rendered one by one
+        const params = this.withVoice({
+            subject,
+            prefetch_audio: 'true'
+        });
+        const response = await fetch(`/api/quotes/stream?${params.toString()}`);
+
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.detail || 'Failed to fetch quotes');
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+        let isPerson = false;
+        let count = 0;
+
+        const handleLine = (line) => {
+            if (!line.trim()) {
+                return;
+            }
+            const event = JSON.parse(line);
+            if (event.type === 'meta') {
+                isPerson = event.is_person;
+                this.beginQuotes(subject, isPerson);
+            } else if (event.type === 'quote') {
+                this.appendQuote(event, count++, isPerson, event.audio_url);
+            } else if (event.type === 'error') {
+                throw new Error(event.detail);
+            }
+        };
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffered += decoder.decode(value, { stream: true });
+            const lines = buffered.split('\n');
+            buffered = lines.pop();
+            lines.forEach(handleLine);
+        }
+        handleLine(buffered + decoder.decode());
+
+        if (count === 0) {
+            throw new Error('No quotes received');
+        }
+    }
+
+    displayQuotes(subject, quotes, is_person, audioUrls) {
+        this.beginQuotes(subject, is_person);
+
+        quotes.forEach((quoteData, index) => {
+            const audioUrl = audioUrls ? audioUrls[index] : null;
+            this.appendQuote(quoteData, index, is_person, audioUrl);
+        });
     }
 
-    displayQuotes(subject, quotes, is_person) {
+    beginQuotes(subject, is_person) {
         if (is_person) {
             this.quotesTitle.textContent = `Quotes by ${subject}`;
         } else {
             this.quotesTitle.textContent = `Quotes about "${subject}"`;
         }
         this.quotesList.innerHTML = '';
-
-        quotes.forEach((quoteData, index) => {
-            const quoteElement = this.createQuoteElement(quoteData, index, is_person);
-            this.quotesList.appendChild(quoteElement);
-        });
-
         this.showQuotes();
     }
 
-    createQuoteElement(quoteData, index, is_person) {
+    appendQuote(quoteData, index, is_person, audioUrl) {
+        const quoteElement = this.createQuoteElement(quoteData, index, is_person, audioUrl);
+        this.quotesList.appendChild(quoteElement);
+    }
+
+    createQuoteElement(quoteData, index, is_person, audioUrl) {
         const quoteDiv = document.createElement('div');
         quoteDiv.className = 'quote-item';
         quoteDiv.innerHTML = `
@@ -120,6 +192,9 @@ class QuotesApp {
 
         // Add click event listener to play button
         const playBtn = quoteDiv.querySelector('.play-btn');
+        if (audioUrl) {
+            playBtn.dataset.audioUrl = audioUrl;
+        }
         playBtn.addEventListener('click', () => this.handlePlayQuote(playBtn));
 
         return quoteDiv;
@@ -132,7 +207,7 @@ class QuotesApp {
         this.setPlayButtonLoading(playBtn, true);
 
         try {
-            await this.playQuoteAudio(quote);
+            await this.playQuoteAudio(quote, playBtn.dataset.audioUrl);
         } catch (error) {
             console.error('Error playing quote:', error);
             // Fallback to browser TTS if Gemini TTS fails
@@ -142,45 +217,62 @@ class QuotesApp {
         }
     }
 
-    async playQuoteAudio(quote) {
-        // Get saved voice setting or use default
+    async handlePlayAll() {
+        // One quote per line: the server synthesizes them as separate chunks
+        // (reusing prefetched audio) and streams them back as a single MP3
+        const quotes = Array.from(this.quotesList.querySelectorAll('.play-btn'))
+            .map(playBtn => playBtn.dataset.quote);
+        if (quotes.length === 0) {
+            return;
+        }
+        const text = quotes.join('\n');
+
+        this.playAllBtn.disabled = true;
+        try {
+            const params = this.withVoice({ text });
+            const audio = new Audio(`/api/tts/stream?${params.toString()}`);
+            await audio.play();
+        } catch (error) {
+            console.error('Error playing all quotes:', error);
+            this.playWithBrowserTTS(quotes.join(' '));
+        } finally {
+            this.playAllBtn.disabled = false;
+        }
+    }
+
+    getVoiceId() {
+        // The voice picked in this browser, or null to let the server use the
+        // user's saved voice or its default
         const savedSettings = localStorage.getItem('appSettings');
-        let voiceId = 'Aoede'; // Default voice
         if (savedSettings) {
             try {
                 const settings = JSON.parse(savedSettings);
-                voiceId = settings.voiceId || 'Aoede';
+                return settings.voiceId || null;
             } catch (e) {
                 console.error('Error parsing saved settings:', e);
             }
         }
+        return null;
+    }
 
-        const response = await fetch('/api/tts', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({ 
-                text: quote,
-                voice_id: voiceId
-            })
-        });
-
-        if (!response.ok) {
-            const errorData = await response.json();
-            throw new Error(errorData.detail || 'Failed to generate speech');
-        }
+    withVoice(params) {
+        // Query parameters, with voice_id only when a voice was picked
+        const voiceId = this.getVoiceId();
+        return new URLSearchParams(voiceId ? { ...params, voice_id: voiceId } : params);
+    }
 
-        const data = await response.json();
-        
-        // Check if server wants us to use browser TTS
-        if (data.audio_data === "USE_BROWSER_TTS") {
-            this.playWithBrowserTTS(quote);
-            return;
+    async playQuoteAudio(quote, audioUrl) {
+        // Audio prefetched alongside the quotes is already being synthesized on
+        // the server; otherwise stream the MP3 straight into an <audio> element
+        // so playback can start before the whole clip has downloaded
+        if (!audioUrl) {
+            const params = this.withVoice({ text: quote });
+            audioUrl = `/api/tts/audio?${params.toString()}`;
         }
+        const audio = new Audio(audioUrl);
         
-        // Create audio element and play
-        const audio = new Audio(data.audio_data);
+        // Rejects if the server could not synthesize the audio, in which case
+        // handlePlayQuote falls back to browser TTS
         await audio.play();
     }
 
@@ -22,7 +22,10 @@ document.addEventListener('DOMContentLoaded', function() {
 
 function loadToolbar() {
     const toolbarContainer = document.getElementById('toolbar-container');
-    if (toolbarContainer) {
+    // Pages served by the app already have the toolbar inlined
+    if (toolbarContainer && toolbarContainer.children.length > 0) {
+        highlightCurrentPage();
+    } else if (toolbarContainer) {
         fetch('/static/index.html')
             .then(response => response.text())
             .then(html => {
@@ -218,22 +221,22 @@ async function saveSettings() {
     saveBtn.innerHTML = '💾 Saving...';
     
     try {
-        // Save to server if voice is selected
-        if (currentSettings.voiceId) {
-            const response = await fetch('/api/settings', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    voice_id: currentSettings.voiceId
-                })
-            });
-            
-            const data = await response.json();
-            if (!data.success) {
-                throw new Error(data.message);
-            }
+        // Save to server so the saved voice is used for prefetching on every page
+        const response = await fetch('/api/settings', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                voice_id: currentSettings.voiceId || null,
+                sound_effects: currentSettings.soundEffects,
+                auto_tts: currentSettings.autoTts
+            })
+        });
+        
+        const data = await response.json();
+        if (!data.success) {
+            throw new Error(data.message);
         }
         
         // Save to localStorage
@@ -250,30 +253,48 @@ async function saveSettings() {
     }
 }
 
-function loadSettings() {
+async function loadSettings() {
     try {
         const saved = localStorage.getItem('appSettings');
         if (saved) {
-            const settings = JSON.parse(saved);
-            currentSettings = { ...currentSettings, ...settings };
-            
-            // Apply loaded settings to UI
-            if (currentSettings.voiceId) {
-                setTimeout(() => {
-                    const voiceSelect = document.getElementById('voice-select');
-                    voiceSelect.value = currentSettings.voiceId;
-                    updateVoicePreview(currentSettings.voiceId);
-                    document.getElementById('test-voice-btn').disabled = false;
-                    document.getElementById('save-settings-btn').disabled = false;
-                }, 500); // Wait for voices to load
-            }
-            
-            document.getElementById('sound-effects').checked = currentSettings.soundEffects;
-            document.getElementById('auto-tts').checked = currentSettings.autoTts;
+            currentSettings = { ...currentSettings, ...JSON.parse(saved) };
+            applySettings();
         }
     } catch (error) {
         console.error('Error loading settings:', error);
     }
+    
+    // Settings saved on the server win over the local copy
+    try {
+        const response = await fetch('/api/settings');
+        const settings = await response.json();
+        if (settings.voice_id) {
+            currentSettings = {
+                voiceId: settings.voice_id,
+                soundEffects: settings.sound_effects,
+                autoTts: settings.auto_tts
+            };
+            localStorage.setItem('appSettings', JSON.stringify(currentSettings));
+            applySettings();
+        }
+    } catch (error) {
+        console.error('Error loading server settings:', error);
+    }
+}
+
+function applySettings() {
+    if (currentSettings.voiceId) {
+        setTimeout(() => {
+            const voiceSelect = document.getElementById('voice-select');
+            voiceSelect.value = currentSettings.voiceId;
+            updateVoicePreview(currentSettings.voiceId);
+            document.getElementById('test-voice-btn').disabled = false;
+            document.getElementById('save-settings-btn').disabled = false;
+        }, 500); // Wait for voices to load
+    }
+    
+    document.getElementById('sound-effects').checked = currentSettings.soundEffects;
+    document.getElementById('auto-tts').checked = currentSettings.autoTts;
 }
 
 function resetSettings() {
@@ -293,8 +314,11 @@ function resetSettings() {
         
         clearVoicePreview();
         
-        // Clear localStorage
+        // Clear localStorage and the server copy
         localStorage.removeItem('appSettings');
+        fetch('/api/settings', { method: 'DELETE' }).catch(error => {
+            console.error('Error resetting server settings:', error);
+        });
         
         showStatus('Settings reset to default values.', 'info');
     }
@@ -0,0 +1,44 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The app's modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    """
+    The app module with fake upstreams and its state in a temporary directory
+    """
+    state_dir = tempfile.mkdtemp(prefix="voice-tests-")
+    os.environ.update(
+        TTS_CACHE_DIR=os.path.join(state_dir, "tts"),
+        QUOTE_CACHE_PATH=os.path.join(state_dir, "quotes.sqlite3"),
+        SETTINGS_DB_PATH=os.path.join(state_dir, "settings.sqlite3"),
+        COORDINATION_DB_PATH=os.path.join(state_dir, "leases.sqlite3"),
+        RATE_LIMIT_PER_SECOND="0",
+        WARM_ENABLED="0",
+    )
+    from benchmarks import fakes
+    fakes.CONFIG.latency_ms = 0
+    fakes.install()
+
+    import app
+    return app
+
+
+@pytest.fixture(scope="session")
+def run():
+    """
+    Run a coroutine to completion on one event loop shared by every test. The app's
+    lazily created semaphores bind to the first loop that waits on them, so it must
+    only ever see one loop, as in production.
+    """
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
@@ -0,0 +1,38 @@
+import pytest
+
+from benchmarks.loadtest import asgi_request
+
+TOKEN = "test-admin-token"
+NEW_LIMITS = {"rate_limit_per_second": 7, "gemini": {"max_concurrency": 3}}
+
+
+@pytest.fixture
+def call_api(app_module, run):
+    def call(method, path, body=None, headers=None):
+        return run(asgi_request(app_module.app, method, path, body, headers)).status
+    return call
+
+
+@pytest.mark.parametrize("method", ["GET", "PUT"])
+def test_limits_are_disabled_without_admin_token(call_api, monkeypatch, method):
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    body = NEW_LIMITS if method == "PUT" else None
+    assert call_api(method, "/api/admin/limits", body) == 404
+    assert call_api(method, "/api/admin/limits", body, {"X-Admin-Token": ""}) == 404
+
+
+def test_limits_update_requires_matching_token(app_module, call_api, monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", TOKEN)
+    before = app_module.rate_limiter.stats()
+    assert call_api("PUT", "/api/admin/limits", NEW_LIMITS) == 403
+    assert call_api("PUT", "/api/admin/limits", NEW_LIMITS, {"X-Admin-Token": TOKEN[:-1]}) == 403
+    assert app_module.rate_limiter.stats() == before
+
+    gemini = app_module.gemini_budget.stats()
+    try:
+        assert call_api("PUT", "/api/admin/limits", NEW_LIMITS, {"X-Admin-Token": TOKEN}) == 200
+        assert app_module.rate_limiter.stats()["rate"] == 7
+        assert app_module.gemini_budget.stats()["max_concurrency"] == 3
+    finally:
+        app_module.rate_limiter.configure(rate=before["rate"], burst=before["burst"])
+        app_module.gemini_budget.configure(max_concurrency=gemini["max_concurrency"], max_queue=gemini["max_queue"])
@@ -0,0 +1,46 @@
+import gzip
+
+import pytest
+
+from assets import IMMUTABLE, Asset
+
+BODY = b"body { color: black; }\n" * 64
+
+
+def make_asset():
+    # br is filled in by hand so the test does not depend on brotli being installed
+    return Asset.build(BODY, "text/css; charset=utf-8", IMMUTABLE)._replace(br=b"brotli body")
+
+
+@pytest.mark.parametrize("accept_encoding, encoding", [
+    (None, None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("gzip, br;q=0", "gzip"),
+])
+def test_each_encoding_has_its_own_etag(accept_encoding, encoding):
+    asset = make_asset()
+    response = asset.response(accept_encoding)
+    assert response.headers.get("content-encoding") == encoding
+    assert response.headers["etag"] == asset.etag_for(encoding)
+    assert response.body == {None: BODY, "gzip": asset.gzip, "br": asset.br}[encoding]
+
+
+def test_variant_etags_differ():
+    asset = make_asset()
+    etags = {asset.etag_for(encoding) for encoding in (None, "gzip", "br")}
+    assert len(etags) == 3
+    assert asset.etag_for("gzip") == asset.etag[:-1] + '-gzip"'
+    assert gzip.decompress(asset.gzip) == BODY
+
+
+def test_not_modified_only_for_the_variant_served():
+    asset = make_asset()
+    gzip_etag = asset.etag_for("gzip")
+    assert asset.response("gzip", gzip_etag).status_code == 304
+    assert asset.response("gzip", gzip_etag).headers["etag"] == gzip_etag
+    # A cached gzip body must not be revalidated as the identity or brotli body
+    assert asset.response(None, gzip_etag).status_code == 200
+    assert asset.response("br", gzip_etag).status_code == 200
+    assert asset.response(None, asset.etag).status_code == 304
@@ -0,0 +1,86 @@
+import pytest
+from starlette.requests import Request
+
+AUDIO = bytes(range(256)) * 4
+AUDIO_ID = "a" * 64
+ETAG = f'"{AUDIO_ID}"'
+
+
+def make_request(**headers):
+    return Request({"type": "http", "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]})
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("items=0-9", None),
+    ("bytes=0-9,20-29", None),
+    ("bytes=a-b", None),
+    ("bytes=-", None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=500-", (500, 1023)),
+    ("bytes=1000-5000", (1000, 1023)),
+    ("bytes=1023-1023", (1023, 1023)),
+    ("bytes=-100", (924, 1023)),
+    ("bytes=-5000", (0, 1023)),
+    ("bytes=-0", (-1, -1)),
+    ("bytes=1024-", (-1, -1)),
+    ("bytes=20-10", (-1, -1)),
+])
+def test_parse_range_header(app_module, header, expected):
+    assert app_module.parse_range_header(header, len(AUDIO)) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=0-", "bytes=-10"])
+def test_no_range_of_an_empty_body_is_satisfiable(app_module, header):
+    assert app_module.parse_range_header(header, 0) == (-1, -1)
+
+
+def test_full_response(app_module):
+    response = app_module.audio_response(make_request(), AUDIO, AUDIO_ID)
+    assert response.status_code == 200
+    assert response.body == AUDIO
+    assert response.headers["etag"] == ETAG
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["cache-control"] == app_module.AUDIO_CACHE_CONTROL
+    assert response.media_type == "audio/mpeg"
+
+
+def test_partial_response(app_module):
+    response = app_module.audio_response(make_request(range="bytes=100-199"), AUDIO, AUDIO_ID)
+    assert response.status_code == 206
+    assert response.body == AUDIO[100:200]
+    assert response.headers["content-range"] == "bytes 100-199/1024"
+    assert response.headers["content-length"] == "100"
+
+
+def test_suffix_range_response(app_module):
+    response = app_module.audio_response(make_request(range="bytes=-24"), AUDIO, AUDIO_ID)
+    assert response.status_code == 206
+    assert response.body == AUDIO[-24:]
+    assert response.headers["content-range"] == "bytes 1000-1023/1024"
+
+
+def test_unsatisfiable_range_response(app_module):
+    response = app_module.audio_response(make_request(range="bytes=2048-"), AUDIO, AUDIO_ID)
+    assert response.status_code == 416
+    assert response.body == b""
+    assert response.headers["content-range"] == "bytes */1024"
+
+
+def test_not_modified_wins_over_range(app_module):
+    response = app_module.audio_response(make_request(if_none_match=ETAG, range="bytes=0-9"), AUDIO, AUDIO_ID)
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == ETAG
+
+
+def test_stale_etag_gets_the_audio(app_module):
+    response = app_module.audio_response(make_request(if_none_match='"' + "b" * 64 + '"'), AUDIO, AUDIO_ID)
+    assert response.status_code == 200
+    assert response.body == AUDIO
+
+
+def test_cache_control_is_passed_through(app_module):
+    response = app_module.audio_response(make_request(), AUDIO, AUDIO_ID, cache_control="private, no-cache")
+    assert response.headers["cache-control"] == "private, no-cache"
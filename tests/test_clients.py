@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from clients import ClientPool
+from upstream import BoundedExecutor
+
+
+class Channel:
+    def __init__(self):
+        self.closed = False
+
+    def check_connectivity_state(self, try_to_connect):
+        if self.closed:
+            raise ValueError("Cannot invoke RPC on closed channel!")
+
+
+class Client:
+    def __init__(self):
+        self._channel = Channel()
+        self.transport = self
+        self.grpc_channel = self
+
+    def close(self):
+        self._channel.closed = True
+
+
+def failing_call(pool, error, close_channel=False):
+    async def scenario():
+        async with pool.acquire() as client:
+            if close_channel:
+                client.close()
+            raise error
+    return scenario()
+
+
+async def borrow(pool):
+    async with pool.acquire() as client:
+        return client
+
+
+@pytest.mark.parametrize("error", [
+    google_exceptions.ServiceUnavailable("overloaded"),
+    google_exceptions.InvalidArgument("bad voice"),
+])
+def test_request_errors_keep_a_healthy_client(error):
+    async def scenario():
+        pool = ClientPool(Client, BoundedExecutor(1), size=1)
+        await pool.start()
+        client = await borrow(pool)
+        with pytest.raises(type(error)):
+            await failing_call(pool, error)
+        assert await borrow(pool) is client
+        assert pool.stats()["replaced"] == 0
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("error, close_channel", [
+    (google_exceptions.Unauthenticated("expired"), False),
+    (google_exceptions.ServiceUnavailable("channel closed"), True),
+])
+def test_client_is_replaced_when_it_is_at_fault(error, close_channel):
+    async def scenario():
+        pool = ClientPool(Client, BoundedExecutor(1), size=1)
+        await pool.start()
+        client = await borrow(pool)
+        with pytest.raises(type(error)):
+            await failing_call(pool, error, close_channel)
+        assert await borrow(pool) is not client
+        assert pool.stats()["replaced"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+
+from coordination import CoordinatedSingleFlight, SQLiteLeases
+from upstream import BoundedExecutor
+
+
+class RecordingLeases(SQLiteLeases):
+    """
+    SQLiteLeases that remembers which threads called it
+    """
+
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self.threads = set()
+
+    def acquire(self, key, ttl):
+        self.threads.add(threading.get_ident())
+        return super().acquire(key, ttl)
+
+    def release(self, key):
+        self.threads.add(threading.get_ident())
+        super().release(key)
+
+    def held(self, key):
+        self.threads.add(threading.get_ident())
+        return super().held(key)
+
+
+def test_workers_share_one_call_without_blocking_the_loop(tmp_path):
+    async def scenario():
+        cache = {}
+        calls = []
+
+        async def generate():
+            calls.append(1)
+            await asyncio.sleep(0.2)
+            cache["subject"] = "quotes"
+            return "quotes"
+
+        # Two workers: separate lease connections on one file, one shared cache
+        leases = [RecordingLeases(str(tmp_path / "leases.sqlite3")) for _ in range(2)]
+        flights = [
+            CoordinatedSingleFlight("quotes", worker_leases, cache.get, BoundedExecutor(2, name="coordination"),
+                                    lease_seconds=5, poll_interval=0.01)
+            for worker_leases in leases
+        ]
+        results = await asyncio.gather(*(flight.do("subject", generate) for flight in flights))
+
+        assert results == ["quotes", "quotes"]
+        assert len(calls) == 1
+        assert sorted(flight.stats()["led"] for flight in flights) == [0, 1]
+        loop_thread = threading.get_ident()
+        assert all(worker_leases.threads and loop_thread not in worker_leases.threads for worker_leases in leases)
+
+    asyncio.run(scenario())
@@ -0,0 +1,97 @@
+import pytest
+
+from fallback_corpus import DEFAULT_QUOTES, FallbackCorpus, edit_distance, tokenize
+
+ENTRIES = [
+    {"quote": "Imagination is more important than knowledge.", "author": "Albert Einstein", "topics": ["imagination", "knowledge"]},
+    {"quote": "Life is like riding a bicycle.", "author": "Albert Einstein", "topics": ["life", "balance"]},
+    {"quote": "Creativity is intelligence having fun.", "author": "Anonymous", "topics": ["imagination", "creativity"]},
+    {"quote": "Knowledge speaks, but wisdom listens.", "author": "Jimi Hendrix", "topics": ["wisdom", "knowledge"]},
+    {"quote": "Nothing in life is to be feared, it is only to be understood.", "author": "Marie Curie", "topics": ["fear", "understanding"]},
+    {"quote": "The only true wisdom is in knowing you know nothing.", "author": "Socrates", "topics": ["wisdom", "humility"]},
+]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return FallbackCorpus(ENTRIES)
+
+
+def authors(results):
+    return [quote["context"] for quote in results]
+
+
+def test_tokenize_folds_case_and_accents():
+    assert tokenize("Gödel's THEOREM, a b") == ["godel", "theorem"]
+
+
+@pytest.mark.parametrize("a, b, distance", [("einstein", "einstein", 0), ("einstien", "einstein", 1), ("kitten", "sitting", 3)])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b) == distance
+
+
+def test_author_outranks_topic_outranks_text(corpus):
+    # "imagination" is Einstein's topic and word, Anonymous' topic only
+    assert authors(corpus.search("imagination"))[:2] == ["Albert Einstein", "Anonymous"]
+    # "knowledge" is a topic of two authors; spread across them before repeating one
+    assert authors(corpus.search("knowledge"))[:2] == ["Albert Einstein", "Jimi Hendrix"]
+    assert authors(corpus.search("einstein")) == ["Albert Einstein", "Albert Einstein", DEFAULT_QUOTES[0]["context"]]
+
+
+def test_query_tokens_add_up(corpus):
+    assert corpus.search("wisdom humility")[0]["context"] == "Socrates"
+    assert corpus.search("einstein bicycle")[0]["quote"] == "Life is like riding a bicycle."
+
+
+@pytest.mark.parametrize("subject", ["einstien", "Albert Einstien", "imaginaton"])
+def test_misspellings_match_by_trigrams(corpus, subject):
+    assert corpus.search(subject)[0]["context"] == "Albert Einstein"
+
+
+def test_short_or_distant_tokens_do_not_fuzzy_match(corpus):
+    assert corpus.search("xyz") == DEFAULT_QUOTES
+    assert corpus.search("zebra crossing") == DEFAULT_QUOTES
+
+
+def test_stopwords_are_ignored(corpus):
+    assert corpus.search("quotes about the") == DEFAULT_QUOTES
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5])
+def test_results_respect_the_limit(corpus, limit):
+    assert len(corpus.search("wisdom knowledge imagination", limit=limit)) == limit
+
+
+@pytest.mark.parametrize("subject, first", [
+    ("Marie Curie", "Nothing in life is to be feared, it is only to be understood."),
+    ("bicycle", "Life is like riding a bicycle."),
+])
+def test_single_matches_are_padded_with_generic_quotes(corpus, subject, first):
+    results = corpus.search(subject)
+    assert [quote["quote"] for quote in results] == [first] + [quote["quote"] for quote in DEFAULT_QUOTES[:2]]
+
+
+def test_padding_skips_quotes_already_picked():
+    corpus = FallbackCorpus([{"quote": DEFAULT_QUOTES[0]["quote"], "author": DEFAULT_QUOTES[0]["context"], "topics": ["courage"]}])
+    assert corpus.search("courage") == DEFAULT_QUOTES
+
+
+def test_results_are_copies(corpus):
+    defaults = [dict(quote) for quote in DEFAULT_QUOTES]
+    corpus.search("einstein")[0]["quote"] = "changed"
+    corpus.search("nothing matches zzz")[0]["quote"] = "changed"
+    assert corpus.search("einstein")[0]["quote"] != "changed"
+    assert DEFAULT_QUOTES == defaults
+
+
+def test_bundled_corpus_loads_and_tags_each_quote():
+    corpus = FallbackCorpus.load()
+    assert len(corpus) > 100
+    assert "Khalil Gibran" not in authors(corpus.search("friendship"))
+    assert len(corpus.search("Marie Curie")) == 3
+
+
+def test_unreadable_corpus_is_empty(tmp_path):
+    corpus = FallbackCorpus.load(str(tmp_path / "missing.json"))
+    assert len(corpus) == 0
+    assert corpus.search("einstein") == DEFAULT_QUOTES
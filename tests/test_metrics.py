@@ -0,0 +1,13 @@
+from benchmarks.loadtest import asgi_request
+
+
+def test_unmatched_requests_are_not_labelled_as_a_mount(app_module, run):
+    async def scenario():
+        assert (await asgi_request(app_module.app, "GET", "/wp-login.php")).status == 404
+        assert (await asgi_request(app_module.app, "GET", "/static/styles.css")).status == 200
+        return (await asgi_request(app_module.app, "GET", "/metrics")).body.decode()
+
+    metrics = run(scenario())
+    assert 'route="unmatched",status="404"' in metrics
+    assert 'route="/static",status="404"' not in metrics
+    assert 'route="/static",status="200"' in metrics
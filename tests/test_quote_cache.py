@@ -0,0 +1,121 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import quote_cache as quote_cache_module
+from quote_cache import QuoteCache
+
+RESULT = {"quotes": [{"quote": "Stay curious.", "context": "Interview"}], "is_person": True, "is_fallback": False}
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(quote_cache_module, "time", SimpleNamespace(time=clock))
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = QuoteCache(str(tmp_path / "quotes.sqlite3"), ttl_seconds=100, stale_seconds=50)
+    yield cache
+    cache.close()
+
+
+def test_fresh_then_stale_then_expired(cache, clock):
+    assert cache.put("Einstein", RESULT)
+    expected = {"quotes": RESULT["quotes"], "is_person": True}
+    assert cache.get("  EINSTEIN ") == (expected, True)
+
+    clock.now += 101
+    assert cache.get("einstein") == (expected, False)
+
+    clock.now += 50
+    assert cache.get("einstein") is None
+    # Expired entries are deleted on lookup
+    assert cache.subjects() == []
+    assert cache.stats() == {
+        "hits": 1, "stale_hits": 1, "misses": 1, "hit_rate": pytest.approx(2 / 3),
+        "stores": 1, "skipped_fallbacks": 0, "entries": 0,
+    }
+
+
+def test_put_refreshes_the_entry(cache, clock):
+    cache.put("einstein", RESULT)
+    clock.now += 120
+    cache.put("einstein", RESULT)
+    assert cache.get("einstein")[1] is True
+
+
+def test_uncounted_lookups_leave_counters_alone(cache, clock):
+    cache.put("einstein", RESULT)
+    cache.get("einstein", count=False)
+    cache.get("unknown", count=False)
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale_hits"], stats["misses"]) == (0, 0, 0)
+
+
+def test_fallback_results_are_never_cached(cache, clock):
+    assert not cache.put("courage", {**RESULT, "is_fallback": True})
+    assert cache.get("courage") is None
+    assert cache.stats()["skipped_fallbacks"] == 1
+
+
+def test_purge(cache, clock):
+    for subject in ("a", "b", "c"):
+        cache.put(subject, RESULT)
+    assert cache.purge("B") == 1
+    assert cache.subjects() == ["a", "c"]
+    assert cache.purge() == 2
+    assert cache.subjects() == []
+
+
+class CountingGenerator:
+    def __init__(self, is_fallback=False):
+        self.is_fallback = is_fallback
+        self.calls = 0
+
+    def generate_quotes(self, subject, deadline=None):
+        self.calls += 1
+        return {"quotes": [{"quote": f"Fresh #{self.calls}", "context": subject}], "is_person": False, "is_fallback": self.is_fallback}
+
+
+def test_stale_entry_is_served_while_it_is_regenerated(app_module, run, monkeypatch, clock):
+    generator = CountingGenerator()
+    monkeypatch.setattr(app_module, "get_quotes_generator", lambda: generator)
+    app_module.quote_cache.put("stale subject", RESULT)
+    clock.now += app_module.quote_cache.ttl_seconds + 1
+
+    async def scenario():
+        # Both callers get the stale result at once; only one refresh runs
+        first, second = await asyncio.gather(app_module.fetch_quotes("stale subject"), app_module.fetch_quotes("Stale Subject"))
+        assert first["quotes"] == second["quotes"] == RESULT["quotes"]
+        await asyncio.gather(*list(app_module.background_tasks))
+
+    run(scenario())
+    assert generator.calls == 1
+    result, is_fresh = app_module.quote_cache.get("stale subject", count=False)
+    assert is_fresh
+    assert result["quotes"] == [{"quote": "Fresh #1", "context": "stale subject"}]
+
+
+def test_fallback_results_are_not_stored_by_the_app(app_module, run, monkeypatch):
+    generator = CountingGenerator(is_fallback=True)
+    monkeypatch.setattr(app_module, "get_quotes_generator", lambda: generator)
+
+    async def scenario():
+        for _ in range(2):
+            assert (await app_module.fetch_quotes("fallback subject"))["is_fallback"]
+
+    run(scenario())
+    assert generator.calls == 2
+    assert app_module.quote_cache.get("fallback subject", count=False) is None
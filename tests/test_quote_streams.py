@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+from benchmarks import fakes
+from benchmarks.loadtest import asgi_request
+from singleflight import StreamFlight
+
+
+async def collect(stream):
+    return [event async for event in stream]
+
+
+def test_followers_replay_and_share_one_stream():
+    async def scenario():
+        flight = StreamFlight()
+        release = asyncio.Event()
+
+        async def events():
+            yield 1
+            await release.wait()
+            yield 2
+
+        leader = asyncio.ensure_future(collect(flight.start("key", events())))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(collect(flight.join("key")))
+        await asyncio.sleep(0)
+        release.set()
+        assert await leader == [1, 2]
+        assert await follower == [1, 2]
+        assert flight.join("key") is None
+        assert flight.stats() == {"calls": 1, "coalesced": 1, "in_flight": 0}
+
+    asyncio.run(scenario())
+
+
+def test_stream_errors_reach_every_subscriber():
+    async def scenario():
+        flight = StreamFlight()
+
+        async def events():
+            yield 1
+            raise RuntimeError("upstream went away")
+
+        streams = [flight.start("key", events()), flight.join("key")]
+        for stream in streams:
+            received = []
+            try:
+                async for event in stream:
+                    received.append(event)
+            except RuntimeError:
+                pass
+            else:
+                raise AssertionError("error was not raised")
+            assert received == [1]
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_quote_streams_make_one_upstream_call(app_module, run):
+    async def stream(path):
+        response = await asgi_request(app_module.app, "GET", path)
+        return [json.loads(line) for line in response.body.decode().splitlines()]
+
+    async def scenario():
+        before = fakes.CALLS["generate_content"]
+        results = await asyncio.gather(*(stream("/api/quotes/stream?subject=coalesced+streams") for _ in range(8)))
+        assert fakes.CALLS["generate_content"] - before == 1
+        assert all(result == results[0] for result in results)
+        assert results[0][-1] == {"type": "done", "is_fallback": False}
+
+    run(scenario())
+
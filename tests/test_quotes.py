@@ -0,0 +1,208 @@
+import json
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from quotes import QuoteStreamParser, QuotesGenerator
+from resilience import OPEN, CircuitBreaker
+
+QUOTES = [
+    {"quote": 'He said "stay {curious}" twice', "context": "Interview, 1950"},
+    {"quote": "Back\\slash [and] brackets", "context": "Letter"},
+]
+DOCUMENT = json.dumps({"is_person": True, "quotes": QUOTES})
+
+
+def feed_all(parser, chunks):
+    quotes = []
+    for chunk in chunks:
+        quotes.extend(parser.feed(chunk))
+    return quotes
+
+
+def test_parser_handles_any_chunk_boundary():
+    # Every split point, including inside strings and right after a backslash
+    for split in range(1, len(DOCUMENT)):
+        parser = QuoteStreamParser()
+        assert feed_all(parser, [DOCUMENT[:split], DOCUMENT[split:]]) == QUOTES
+        assert parser.is_person is True
+
+
+def test_parser_returns_each_quote_when_its_object_closes():
+    parser = QuoteStreamParser()
+    received = [parser.feed(char) for char in DOCUMENT]
+    closing = [i for i, quotes in enumerate(received) if quotes]
+    assert [received[i][0] for i in closing] == QUOTES
+    assert closing[-1] < len(DOCUMENT) - 2
+
+
+def test_parser_is_person_after_quotes():
+    document = json.dumps({"quotes": QUOTES, "is_person": False})
+    parser = QuoteStreamParser()
+    quotes = parser.feed(document[:document.index('"is_person"')])
+    assert quotes == QUOTES
+    assert parser.is_person is None
+    parser.feed(document[document.index('"is_person"'):])
+    assert parser.is_person is False
+
+
+def test_parser_skips_malformed_objects():
+    document = (
+        '{"is_person": false, "quotes": ['
+        '{"quote": "no context"}, '
+        '{"quote": 42, "context": "not a string"}, '
+        '{"quote": "broken", "context": }, '
+        '{"quote": "kept", "context": "nested", "source": {"page": 3}}, '
+        '["not", "an", "object"]'
+        ']}'
+    )
+    assert QuoteStreamParser().feed(document) == [{"quote": "kept", "context": "nested"}]
+
+
+def test_parser_ignores_objects_outside_arrays():
+    assert QuoteStreamParser().feed('{"quote": "top level", "context": "not in a list"}') == []
+
+
+class ScriptedModel:
+    """
+    Streams the given chunks, then raises error if one is given
+    """
+
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+        self.calls = 0
+
+    def generate_content(self, *args, **kwargs):
+        self.calls += 1
+
+        def stream():
+            for chunk in self.chunks:
+                yield type("Chunk", (), {"text": chunk})()
+            if self.error is not None:
+                raise self.error
+
+        return stream()
+
+
+def generator_with(model, breaker=None):
+    generator = QuotesGenerator("test", breaker=breaker or CircuitBreaker("test-stream"))
+    generator.model = model
+    return generator
+
+
+def chunked(document, size=7):
+    return [document[i:i + size] for i in range(0, len(document), size)]
+
+
+def test_stream_yields_meta_quotes_and_done():
+    breaker = CircuitBreaker("test-stream", failure_threshold=1)
+    events = list(generator_with(ScriptedModel(chunked(DOCUMENT)), breaker).stream_quotes("Einstein"))
+    assert events == [
+        {"type": "meta", "is_person": True},
+        *({"type": "quote", **quote} for quote in QUOTES),
+        {"type": "done", "is_fallback": False},
+    ]
+    assert breaker.failures == 0
+
+
+def test_stream_holds_quotes_until_is_person_is_known():
+    document = json.dumps({"quotes": QUOTES, "is_person": True})
+    events = list(generator_with(ScriptedModel(chunked(document))).stream_quotes("Einstein"))
+    assert [event["type"] for event in events] == ["meta", "quote", "quote", "done"]
+    assert events[0] == {"type": "meta", "is_person": True}
+
+
+def test_stream_without_is_person_uses_remembered_answer():
+    generator = generator_with(ScriptedModel(chunked(json.dumps({"quotes": QUOTES}))))
+    generator._remember_is_person("einstein", True)
+    events = list(generator.stream_quotes("Einstein"))
+    assert events[0] == {"type": "meta", "is_person": True}
+    assert events[-1] == {"type": "done", "is_fallback": False}
+
+
+def test_stream_error_before_any_quote_falls_back():
+    breaker = CircuitBreaker("test-stream", failure_threshold=1)
+    model = ScriptedModel(['{"is_person": false, "quo'], error=google_exceptions.ServiceUnavailable("down"))
+    events = list(generator_with(model, breaker).stream_quotes("courage"))
+    assert events[0] == {"type": "meta", "is_person": False}
+    assert len(events) > 2
+    assert [event["type"] for event in events[1:-1]] == ["quote"] * (len(events) - 2)
+    assert events[-1] == {"type": "done", "is_fallback": True}
+    assert breaker.state == OPEN
+
+
+def test_stream_error_after_quotes_keeps_partial_result():
+    partial = DOCUMENT[:DOCUMENT.index("Back")]
+    model = ScriptedModel(chunked(partial), error=google_exceptions.DeadlineExceeded("slow"))
+    events = list(generator_with(model).stream_quotes("Einstein"))
+    assert events == [
+        {"type": "meta", "is_person": True},
+        {"type": "quote", **QUOTES[0]},
+        {"type": "done", "is_fallback": False, "complete": False},
+    ]
+
+
+def test_stream_without_quotes_falls_back():
+    model = ScriptedModel([json.dumps({"is_person": False, "quotes": []})])
+    events = list(generator_with(model).stream_quotes("courage"))
+    assert [event for event in events if event["type"] == "meta"] == [{"type": "meta", "is_person": False}]
+    assert events[-1] == {"type": "done", "is_fallback": True}
+
+
+def test_stream_client_error_does_not_count_against_breaker():
+    breaker = CircuitBreaker("test-stream", failure_threshold=1)
+    model = ScriptedModel([], error=google_exceptions.InvalidArgument("bad request"))
+    events = list(generator_with(model, breaker).stream_quotes("courage"))
+    assert events[-1] == {"type": "done", "is_fallback": True}
+    assert breaker.failures == 0
+
+
+def test_stream_with_open_breaker_skips_gemini():
+    breaker = CircuitBreaker("test-stream", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    model = ScriptedModel(chunked(DOCUMENT))
+    events = list(generator_with(model, breaker).stream_quotes("courage"))
+    assert model.calls == 0
+    assert events[-1] == {"type": "done", "is_fallback": True}
+
+
+@pytest.mark.parametrize("subject", ["Einstein", "  einstein ", "ＥＩＮＳＴＥＩＮ"])
+def test_stream_remembers_is_person_by_normalized_subject(subject):
+    generator = generator_with(ScriptedModel(chunked(DOCUMENT)))
+    list(generator.stream_quotes("Einstein"))
+    assert generator._cached_is_person(subject) is True
+
+
+class RecordingModel:
+    """
+    Answers every call with DOCUMENT (or "NO" for the legacy person check), remembering request_options
+    """
+
+    def __init__(self):
+        self.request_options = []
+
+    def generate_content(self, prompt, generation_config=None, stream=False, request_options=None, **kwargs):
+        self.request_options.append(request_options)
+        if stream:
+            return iter([type("Chunk", (), {"text": DOCUMENT})()])
+        if not generation_config:
+            return type("Response", (), {"text": "NO"})()
+        text = DOCUMENT if generation_config["response_schema"]["type"] == "object" else json.dumps(QUOTES)
+        return type("Response", (), {"text": text})()
+
+
+@pytest.mark.parametrize("call", [
+    lambda generator: generator.generate_quotes("courage"),
+    lambda generator: list(generator.stream_quotes("courage")),
+])
+@pytest.mark.parametrize("single_call", [True, False])
+def test_client_library_retries_are_disabled(call, single_call):
+    model = RecordingModel()
+    generator = generator_with(model)
+    generator.single_call = single_call
+    call(generator)
+    assert model.request_options
+    for options in model.request_options:
+        assert options["retry"] is None
+        assert options["timeout"] > 0
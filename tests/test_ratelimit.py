@@ -0,0 +1,160 @@
+import asyncio
+import math
+
+import pytest
+
+from ratelimit import ClientRateLimiter, Overloaded, TokenBucket, UpstreamBudget, retry_after_header
+
+
+def test_token_bucket_spends_burst_then_refills():
+    bucket = TokenBucket(rate=2.0, burst=3.0)
+    now = bucket.updated
+    assert [bucket.try_acquire(now) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire(now) == pytest.approx(0.5)
+    assert bucket.try_acquire(now + 0.5) == 0.0
+    # Idle time never fills the bucket past burst
+    assert [bucket.try_acquire(now + 100) for _ in range(4)][-1] > 0
+
+
+def test_token_bucket_without_rate_never_refills():
+    bucket = TokenBucket(rate=0.0, burst=1.0)
+    assert bucket.try_acquire(bucket.updated) == 0.0
+    assert math.isinf(bucket.try_acquire(bucket.updated + 60))
+
+
+def test_client_rate_limiter_is_per_client():
+    limiter = ClientRateLimiter(rate=0.001, burst=2, max_clients=2)
+    limiter.check("a")
+    limiter.check("a")
+    with pytest.raises(Overloaded) as excinfo:
+        limiter.check("a")
+    assert excinfo.value.status_code == 429
+    limiter.check("b")
+    limiter.check("c")
+    assert limiter.stats()["clients"] == 2
+
+
+@pytest.mark.parametrize("seconds, expected", [(0.1, "1"), (1.0, "1"), (2.5, "3"), (float("inf"), "60")])
+def test_retry_after_header(seconds, expected):
+    assert retry_after_header(seconds) == expected
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_budget_queues_in_order_and_rejects_when_full():
+    async def scenario():
+        budget = UpstreamBudget("test", max_concurrency=1, max_queue=2)
+        await budget.acquire()
+        admitted = []
+
+        async def waiter(name):
+            await budget.acquire()
+            admitted.append(name)
+
+        tasks = [asyncio.create_task(waiter(name)) for name in ("first", "second")]
+        await settle()
+        assert budget.stats()["queued"] == 2
+        with pytest.raises(Overloaded):
+            await budget.acquire()
+
+        budget.release()
+        await settle()
+        assert admitted == ["first"]
+        budget.release()
+        await asyncio.gather(*tasks)
+        assert admitted == ["first", "second"]
+        assert budget.stats() == {
+            "max_concurrency": 1, "max_queue": 2, "in_flight": 1, "queued": 0, "admitted": 3, "rejected": 1,
+        }
+
+    asyncio.run(scenario())
+
+
+def test_configure_sheds_newest_waiters():
+    async def scenario():
+        budget = UpstreamBudget("test", max_concurrency=1, max_queue=3)
+        await budget.acquire()
+        tasks = [asyncio.create_task(budget.acquire()) for _ in range(3)]
+        await settle()
+
+        budget.configure(max_queue=1)
+        await settle()
+        assert [task.done() for task in tasks] == [False, True, True]
+        for task in tasks[1:]:
+            assert isinstance(task.exception(), Overloaded)
+        assert budget.stats()["rejected"] == 2
+
+        budget.release()
+        await tasks[0]
+        assert budget.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_configure_more_concurrency_admits_waiters():
+    async def scenario():
+        budget = UpstreamBudget("test", max_concurrency=1, max_queue=4)
+        await budget.acquire()
+        tasks = [asyncio.create_task(budget.acquire()) for _ in range(2)]
+        await settle()
+
+        budget.configure(max_concurrency=3)
+        await asyncio.gather(*tasks)
+        assert budget.stats()["in_flight"] == 3
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        budget = UpstreamBudget("test", max_concurrency=1, max_queue=2)
+        await budget.acquire()
+        cancelled = asyncio.create_task(budget.acquire())
+        queued = asyncio.create_task(budget.acquire())
+        await settle()
+
+        cancelled.cancel()
+        await settle()
+        assert budget.stats()["queued"] == 1
+
+        budget.release()
+        await queued
+        assert budget.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_slot_handed_to_cancelled_waiter_passes_to_the_next():
+    async def scenario():
+        budget = UpstreamBudget("test", max_concurrency=1, max_queue=2)
+        await budget.acquire()
+        cancelled = asyncio.create_task(budget.acquire())
+        queued = asyncio.create_task(budget.acquire())
+        await settle()
+
+        # The slot is handed over, then the waiter is cancelled before it can run
+        budget.release()
+        cancelled.cancel()
+        await settle()
+        assert cancelled.cancelled()
+        await asyncio.wait_for(queued, 1)
+        assert budget.stats()["in_flight"] == 1
+        assert budget.stats()["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_slot_context_releases_on_error():
+    async def scenario():
+        budget = UpstreamBudget("test", max_concurrency=1, max_queue=0)
+        with pytest.raises(RuntimeError):
+            async with budget.slot():
+                raise RuntimeError("boom")
+        assert budget.in_flight == 0
+        async with budget.slot():
+            assert budget.in_flight == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, Deadline, RetryPolicy, call_with_retry, call_with_retry_async
+
+NO_RETRY = RetryPolicy(attempts=1)
+
+
+def failing(error):
+    def fn(timeout):
+        raise error
+    return fn
+
+
+def test_client_errors_do_not_open_the_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=2)
+    for _ in range(5):
+        with pytest.raises(google_exceptions.InvalidArgument):
+            call_with_retry(failing(google_exceptions.InvalidArgument("bad voice")), breaker, NO_RETRY, Deadline(5))
+    assert breaker.state == CLOSED
+    assert call_with_retry(lambda timeout: "ok", breaker, NO_RETRY, Deadline(5)) == "ok"
+
+
+def test_upstream_errors_open_the_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=2)
+    for _ in range(2):
+        with pytest.raises(google_exceptions.ServiceUnavailable):
+            call_with_retry(failing(google_exceptions.ServiceUnavailable("down")), breaker, NO_RETRY, Deadline(5))
+    assert breaker.state == OPEN
+
+
+def test_client_error_releases_half_open_trial_without_verdict():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        call_with_retry(failing(google_exceptions.ServiceUnavailable("down")), breaker, NO_RETRY, Deadline(5))
+
+    async def bad_request(timeout):
+        raise google_exceptions.InvalidArgument("bad voice")
+
+    with pytest.raises(google_exceptions.InvalidArgument):
+        asyncio.run(call_with_retry_async(bad_request, breaker, NO_RETRY, Deadline(5)))
+    assert breaker.state == HALF_OPEN
+    # The next caller gets the trial
+    assert call_with_retry(lambda timeout: "ok", breaker, NO_RETRY, Deadline(5)) == "ok"
+    assert breaker.state == CLOSED
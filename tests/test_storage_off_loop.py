@@ -0,0 +1,40 @@
+import asyncio
+import threading
+
+from benchmarks.loadtest import asgi_request
+
+
+def test_cache_and_settings_io_stays_off_the_event_loop(app_module, run, monkeypatch):
+    on_loop = []
+
+    def recording(obj, name):
+        method = getattr(obj, name)
+
+        def wrapper(*args, **kwargs):
+            on_loop.append((name, threading.get_ident() == loop_thread))
+            return method(*args, **kwargs)
+
+        monkeypatch.setattr(obj, name, wrapper)
+
+    for obj, names in (
+        (app_module.quote_cache, ("get", "put")),
+        (app_module.settings_store, ("get", "voice_id", "update")),
+        (app_module.tts_cache, ("get", "put_disk", "contains")),
+    ):
+        for name in names:
+            recording(obj, name)
+
+    async def scenario():
+        app = app_module.app
+        cookie = {"Cookie": f"{app_module.USER_COOKIE}={'u' * 32}"}
+        assert (await asgi_request(app, "POST", "/api/settings", {"voice_id": "Puck"}, cookie)).status == 200
+        assert (await asgi_request(app, "GET", "/api/settings", None, cookie)).status == 200
+        assert (await asgi_request(app, "POST", "/api/quotes", {"subject": "storage", "prefetch_audio": True}, cookie)).status == 200
+        assert (await asgi_request(app, "GET", "/api/quotes/stream?subject=storage+stream", None, cookie)).status == 200
+        assert (await asgi_request(app, "POST", "/api/tts/batch", {"texts": ["one", "two"], "voice_id": "Kore"})).status == 200
+        await asyncio.gather(*list(app_module.background_tasks))
+
+    loop_thread = threading.get_ident()
+    run(scenario())
+    assert {name for name, _ in on_loop} >= {"get", "put", "voice_id", "update", "put_disk", "contains"}
+    assert [name for name, loop in on_loop if loop] == []
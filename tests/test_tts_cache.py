@@ -0,0 +1,60 @@
+import os
+import time
+
+from tts_cache import TTSCache
+
+CLIP = b"\xff" * 1000
+
+
+def test_rescan_enforces_the_limit_across_workers(tmp_path):
+    # Two workers sharing a directory each index only their own writes
+    workers = [TTSCache(str(tmp_path), max_disk_bytes=3 * len(CLIP)) for _ in range(2)]
+    for i in range(4):
+        workers[i % 2].put(f"{i:02d}" + "0" * 62, CLIP)
+        time.sleep(0.01)
+    assert sum(len(files) for _, _, files in os.walk(tmp_path)) == 4
+
+    assert workers[0].rescan() == 1
+    assert sum(len(files) for _, _, files in os.walk(tmp_path)) == 3
+    # The oldest clip went, and the other worker's clips are now indexed
+    assert workers[0].stats()["disk_entries"] == 3
+    assert not workers[1].contains("00" + "0" * 62)
+
+
+def test_rescan_keeps_recently_read_clips(tmp_path):
+    cache = TTSCache(str(tmp_path), max_memory_bytes=0, max_disk_bytes=2 * len(CLIP))
+    cache.put("a" * 64, CLIP)
+    time.sleep(0.01)
+    cache.put("b" * 64, CLIP)
+    time.sleep(0.01)
+    assert cache.get("a" * 64) == CLIP
+    other = TTSCache(str(tmp_path), max_memory_bytes=0, max_disk_bytes=2 * len(CLIP))
+    other.put("c" * 64, CLIP)
+
+    cache.rescan()
+    assert cache.contains("a" * 64)
+    assert not cache.contains("b" * 64)
+
+
+def test_disk_io_happens_outside_the_lock(tmp_path, monkeypatch):
+    cache = TTSCache(str(tmp_path))
+    locked = []
+    real_replace, real_utime = os.replace, os.utime
+
+    def replace(*args):
+        locked.append(cache._lock.locked())
+        real_replace(*args)
+
+    def utime(*args):
+        locked.append(cache._lock.locked())
+        real_utime(*args)
+
+    monkeypatch.setattr(os, "replace", replace)
+    monkeypatch.setattr(os, "utime", utime)
+    cache.put("a" * 64, CLIP)
+    restarted = TTSCache(str(tmp_path))
+    assert restarted.get_memory("a" * 64) is None
+    assert restarted.get("a" * 64) == CLIP
+    assert locked == [False, False]
+    assert restarted.stats()["disk_hits"] == 1
+    assert restarted.stats()["misses"] == 0
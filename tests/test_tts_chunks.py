@@ -0,0 +1,76 @@
+import pytest
+
+from tts_chunks import split_text, strip_id3
+
+FRAMES = b"\xff\xfb" + bytes(300)
+
+
+def id3v2(payload: bytes, footer: bool = False) -> bytes:
+    size = len(payload)
+    syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    flags = 0x10 if footer else 0
+    return b"ID3\x04\x00" + bytes([flags]) + syncsafe + payload + (b"3DI" + bytes(7) if footer else b"")
+
+
+ID3V1 = b"TAG" + bytes(125)
+
+
+def test_split_packs_whole_sentences():
+    text = "First sentence. Second one! Third? Fourth."
+    assert split_text(text, max_chars=30) == ["First sentence. Second one!", "Third? Fourth."]
+    assert split_text(text) == [text]
+
+
+def test_split_does_not_end_sentences_inside_numbers_or_names():
+    text = "Pi is 3.14 or so. See example.com for more."
+    assert split_text(text, max_chars=20) == ["Pi is 3.14 or so.", "See example.com for", "more."]
+
+
+def test_split_keeps_closing_quotes_with_their_sentence():
+    assert split_text('He said "Go." Then left.', max_chars=15) == ['He said "Go."', "Then left."]
+
+
+def test_line_breaks_are_hard_boundaries():
+    assert split_text("One quote.\nAnother quote.\n\nA third.") == ["One quote.", "Another quote.", "A third."]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("alpha beta; gamma delta, epsilon", ["alpha beta;", "gamma delta,", "epsilon"]),
+    ("alpha, beta gamma delta", ["alpha,", "beta gamma", "delta"]),
+    ("abcdefghijklmnopqrstuvwxyz", ["abcdefghijkl", "mnopqrstuvwx", "yz"]),
+])
+def test_long_sentences_break_at_the_best_separator(text, expected):
+    chunks = split_text(text, max_chars=12)
+    assert chunks == expected
+    assert all(len(chunk) <= 12 for chunk in chunks)
+
+
+def test_split_ignores_blank_text():
+    assert split_text("") == []
+    assert split_text("  \n\t\n") == []
+
+
+def test_strip_id3_removes_leading_and_trailing_tags():
+    audio = id3v2(b"TIT2" + bytes(200)) + FRAMES + ID3V1
+    assert strip_id3(audio) == FRAMES
+
+
+def test_strip_id3_skips_footer():
+    assert strip_id3(id3v2(bytes(50), footer=True) + FRAMES) == FRAMES
+
+
+def test_strip_id3_keeps_header_for_first_clip():
+    header = id3v2(bytes(20))
+    assert strip_id3(header + FRAMES + ID3V1, keep_header=True) == header + FRAMES
+
+
+def test_strip_id3_reads_syncsafe_size():
+    # 200 bytes is 0x01 0x48 in syncsafe form, not 0x00 0xc8
+    tag = id3v2(bytes(200))
+    assert tag[8:10] == b"\x01\x48"
+    assert strip_id3(tag + FRAMES) == FRAMES
+
+
+def test_strip_id3_leaves_untagged_audio_alone():
+    assert strip_id3(FRAMES) == FRAMES
+    assert strip_id3(b"ID3") == b"ID3"
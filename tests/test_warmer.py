@@ -0,0 +1,29 @@
+from warmer import CacheWarmer
+
+
+def make_warmer(**kwargs):
+    async def never(*args):
+        raise AssertionError("no lookups or upstream calls expected")
+
+    return CacheWarmer(never, never, never, never, lambda: True, "Aoede", **kwargs)
+
+
+def test_decay_forgets_subjects_that_left_the_sketch():
+    warmer = make_warmer()
+    warmer.record("Einstein", "Puck")
+    for _ in range(100):
+        warmer.record("Curie", "Kore")
+    for _ in range(50):
+        warmer.decay()
+        warmer.record("Curie")
+
+    assert "einstein" not in warmer.sketch
+    assert warmer.stats()["remembered_subjects"] == 1
+    assert warmer.trending() == [("Curie", ["Kore"])]
+
+
+def test_evicted_subjects_are_forgotten():
+    warmer = make_warmer(sketch_size=2)
+    for subject in ["Einstein", "Curie", "Turing", "Lovelace"]:
+        warmer.record(subject)
+    assert warmer.stats()["remembered_subjects"] == 2
@@ -0,0 +1,259 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(text: str, voice_id: str, model_name: str, prompt: str) -> str:
+    """
+    Build a content-addressed key for a synthesized clip
+    """
+    digest = hashlib.sha256()
+    for part in (text, voice_id, model_name, prompt):
+        encoded = part.encode("utf-8")
+        # Length-prefix each field so ("ab", "c") and ("a", "bc") never collide
+        digest.update(len(encoded).to_bytes(4, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class TTSCache:
+    """
+    Two-tier cache for synthesized MP3 audio.
+
+    The memory tier is an LRU bounded by total bytes. Every entry is also written
+    to a directory on disk, which is bounded by size and evicted oldest-first, so
+    audio survives restarts. The directory can be shared by several worker
+    processes: clips another worker wrote are picked up on lookup, and rescan()
+    brings the whole directory back within max_disk_bytes.
+
+    File I/O never happens under the lock. get_memory() and put_memory() touch
+    only the memory tier and are safe to call on the event loop; get(), put()
+    and put_disk() read or write files and belong on an executor.
+    """
+
+    def __init__(self, cache_dir: str, max_memory_bytes: int = 32 * 1024 * 1024,
+                 max_disk_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.rescan()
+
+    def get(self, key: str, count: bool = True) -> Optional[bytes]:
+        """
+        Return cached audio for key, or None on a miss.
+        Lookups with count=False (e.g. polling for another worker's result) are left out of the counters.
+        """
+        audio = self.get_memory(key, count)
+        if audio is not None:
+            return audio
+
+        with self._lock:
+            indexed = key in self._disk
+        if indexed or self._adopt(key):
+            audio = self._read_disk(key)
+            if audio is not None:
+                with self._lock:
+                    if key in self._disk:
+                        self._disk.move_to_end(key)
+                    if count:
+                        self.disk_hits += 1
+                    self._put_memory(key, audio)
+                return audio
+
+        if count:
+            with self._lock:
+                self.misses += 1
+        return None
+
+    def get_memory(self, key: str, count: bool = True) -> Optional[bytes]:
+        """
+        Return audio for key from the memory tier only; a None here is not counted as a miss
+        """
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                if count:
+                    self.memory_hits += 1
+            return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        """
+        Store audio under key in both tiers
+        """
+        self.put_memory(key, audio)
+        self.put_disk(key, audio)
+
+    def put_memory(self, key: str, audio: bytes) -> None:
+        with self._lock:
+            self._put_memory(key, audio)
+
+    def put_disk(self, key: str, audio: bytes) -> None:
+        if not self.cache_dir or len(audio) > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("TTS cache write failed", extra={"audio_id": key, "error": str(e)})
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(key, 0)
+            self._disk[key] = len(audio)
+            self._disk_bytes += len(audio)
+            evicted = self._evict_disk()
+        self._remove_files(evicted)
+
+    def contains(self, key: str) -> bool:
+        """
+        Check whether key is cached without touching the counters
+        """
+        with self._lock:
+            if key in self._memory or key in self._disk:
+                return True
+        return self._adopt(key)
+
+    def rescan(self) -> int:
+        """
+        Rebuild the disk index from the directory, oldest first, and evict down to
+        max_disk_bytes; returns how many clips were evicted. Each worker sharing the
+        directory only indexes the clips it wrote or read, so rescanning
+        periodically is what keeps the directory as a whole within the limit.
+        """
+        if not self.cache_dir:
+            return 0
+        entries = self._scan_disk()
+        with self._lock:
+            # Clips written during the scan are left out; lookups adopt them until the next scan
+            self._disk = OrderedDict((key, size) for _, key, size in sorted(entries))
+            self._disk_bytes = sum(self._disk.values())
+            evicted = self._evict_disk()
+        self._remove_files(evicted)
+        return len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters and sizes for sizing the cache
+        """
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_evictions": self.memory_evictions,
+                "disk_evictions": self.disk_evictions,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def _put_memory(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.memory_evictions += 1
+
+    def _adopt(self, key: str) -> bool:
+        """
+        Index a clip written to the shared directory by another worker
+        """
+        if not self.cache_dir:
+            return False
+        try:
+            size = os.stat(self._path(key)).st_size
+        except OSError:
+            return False
+        with self._lock:
+            if key not in self._disk:
+                self._disk[key] = size
+                self._disk_bytes += size
+            evicted = self._evict_disk()
+        self._remove_files(evicted)
+        return key not in evicted
+
+    def _evict_disk(self) -> List[str]:
+        """
+        Drop the oldest clips from the index until it fits; the caller removes
+        the returned clips' files once it has released the lock
+        """
+        evicted = []
+        while self._disk_bytes > self.max_disk_bytes:
+            evicted_key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self.disk_evictions += 1
+            evicted.append(evicted_key)
+        return evicted
+
+    def _remove_files(self, keys: List[str]) -> None:
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            # Refresh mtime so the LRU order is rebuilt correctly after a restart
+            os.utime(path)
+            return audio
+        except OSError:
+            # File vanished underneath us, forget about it
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+            return None
+
+    def _scan_disk(self) -> List[Tuple[float, str, int]]:
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".mp3"):
+                    continue
+                try:
+                    st = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, name[:-4], st.st_size))
+        return entries
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.mp3")
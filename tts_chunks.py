@@ -0,0 +1,71 @@
+import re
+from typing import List
+
+# A sentence runs up to terminal punctuation (plus any closing quotes/brackets)
+# that is followed by whitespace, so "3.14" or "example.com" do not end one
+SENTENCE_PATTERN = re.compile(r"\S.*?(?:[.!?…]+[\"'”’)\]]*(?=\s|$)|$)")
+# Places to break a sentence that is too long on its own, best first
+SOFT_BREAKS = ("; ", ": ", ", ", " ")
+
+
+def split_text(text: str, max_chars: int = 400) -> List[str]:
+    """
+    Split text into chunks of at most max_chars for separate synthesis.
+
+    Chunks end at sentence boundaries and are packed with as many whole sentences
+    as fit. Line breaks are hard boundaries, so a text made of one quote per line
+    yields one chunk per quote (and reuses audio already cached for each quote).
+    Only sentences longer than max_chars are broken mid-sentence.
+    """
+    chunks: List[str] = []
+    for paragraph in text.splitlines():
+        current = ""
+        for sentence in _sentences(paragraph):
+            for piece in _break_long(sentence, max_chars):
+                if current and len(current) + 1 + len(piece) <= max_chars:
+                    current = f"{current} {piece}"
+                else:
+                    if current:
+                        chunks.append(current)
+                    current = piece
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def _sentences(paragraph: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_PATTERN.findall(paragraph) if sentence.strip()]
+
+
+def _break_long(sentence: str, max_chars: int) -> List[str]:
+    pieces = []
+    while len(sentence) > max_chars:
+        cut = -1
+        for separator in SOFT_BREAKS:
+            cut = sentence.rfind(separator, 0, max_chars)
+            if cut > 0:
+                cut += len(separator.rstrip())
+                break
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+
+def strip_id3(audio: bytes, keep_header: bool = False) -> bytes:
+    """
+    Remove ID3 metadata from an MP3 clip so clips can be concatenated into one stream.
+    The leading ID3v2 tag is kept when keep_header is set (for the first clip);
+    a trailing ID3v1 tag is always removed.
+    """
+    if not keep_header and len(audio) >= 10 and audio[:3] == b"ID3":
+        # Tag size is a 28-bit "syncsafe" integer, excluding the 10-byte header and optional footer
+        size = (audio[6] & 0x7F) << 21 | (audio[7] & 0x7F) << 14 | (audio[8] & 0x7F) << 7 | (audio[9] & 0x7F)
+        footer = 10 if audio[5] & 0x10 else 0
+        audio = audio[10 + size + footer:]
+    if len(audio) >= 128 and audio[-128:-125] == b"TAG":
+        audio = audio[:-128]
+    return audio
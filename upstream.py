@@ -0,0 +1,59 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class BoundedExecutor:
+    """
+    Runs blocking upstream client calls (Gemini, Cloud TTS) on a thread pool so
+    they never stall the event loop.
+
+    At most max_concurrency calls run at once; the rest wait their turn and are
+    counted in queue_depth.
+    """
+
+    def __init__(self, max_concurrency: int = 16, name: str = "upstream"):
+        self.max_concurrency = max_concurrency
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=name)
+        self._semaphore = None
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.completed = 0
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call fn(*args, **kwargs) on the pool and await its result
+        """
+        if self._semaphore is None:
+            # Created lazily so it binds to the running loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self.queue_depth += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Concurrency limit, queue depth and throughput counters
+        """
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,62 @@
+import hashlib
+import json
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Tuple
+
+
+class Voice(NamedTuple):
+    id: str
+    name: str
+    description: str
+    gender: str
+
+
+def _voice(name: str, gender: str, default: bool = False) -> Voice:
+    description = "Gemini TTS Voice - US English" + (" (Default)" if default else "")
+    return Voice(id=name, name=name, description=description, gender=gender)
+
+
+# Official Gemini TTS voices from Google Cloud documentation with correct gender mapping.
+# Built once at import; the catalog only changes with a deploy.
+VOICES: Tuple[Voice, ...] = (
+    _voice("Achernar", "Female"),
+    _voice("Achird", "Male"),
+    _voice("Algenib", "Male"),
+    _voice("Algieba", "Male"),
+    _voice("Alnilam", "Male"),
+    _voice("Aoede", "Female", default=True),
+    _voice("Autonoe", "Female"),
+    _voice("Callirrhoe", "Female"),
+    _voice("Charon", "Male"),
+    _voice("Despina", "Female"),
+    _voice("Enceladus", "Male"),
+    _voice("Erinome", "Female"),
+    _voice("Fenrir", "Male"),
+    _voice("Gacrux", "Female"),
+    _voice("Iapetus", "Male"),
+    _voice("Kore", "Female"),
+    _voice("Laomedeia", "Female"),
+    _voice("Leda", "Female"),
+    _voice("Orus", "Male"),
+    _voice("Pulcherrima", "Female"),
+    _voice("Puck", "Male"),
+    _voice("Rasalgethi", "Male"),
+    _voice("Sadachbia", "Male"),
+    _voice("Sadaltager", "Male"),
+    _voice("Schedar", "Male"),
+    _voice("Sulafat", "Female"),
+    _voice("Umbriel", "Male"),
+    _voice("Vindemiatrix", "Female"),
+    _voice("Zephyr", "Female"),
+    _voice("Zubenelgenubi", "Male"),
+)
+
+VOICES_BY_ID: Mapping[str, Voice] = MappingProxyType({voice.id: voice for voice in VOICES})
+
+# The /api/voices body, serialized once, and its validator
+VOICES_JSON: bytes = json.dumps({"voices": [voice._asdict() for voice in VOICES]}).encode()
+VOICES_ETAG = '"' + hashlib.sha256(VOICES_JSON).hexdigest()[:32] + '"'
+
+
+def is_valid_voice(voice_id: str) -> bool:
+    return voice_id in VOICES_BY_ID
@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from metrics import REGISTRY, Counter
+from quotes import normalize_subject
+from ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Counts are multiplied by this after every cycle, so subjects that stop being
+# requested fall out of the top-K within a few cycles
+DECAY = 0.9
+# Voices remembered per subject (most recent first) for warming audio
+VOICES_PER_SUBJECT = 3
+
+WARMER_CALLS = REGISTRY.register(Counter(
+    "voice_warmer_upstream_calls_total", "Upstream calls made by the background cache warmer", ("kind",)))
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitters sketch (Metwally et al.): tracks at most `capacity`
+    items. A new item replaces the least frequent one and inherits its count, so
+    counts may be overestimated by at most the evicted count but every item more
+    frequent than total/capacity is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity: int = 500):
+        self.capacity = capacity
+        self.counts: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, item: str, weight: float = 1.0) -> Optional[str]:
+        """
+        Count item; returns the item it evicted, if any
+        """
+        with self._lock:
+            if item in self.counts:
+                self.counts[item] += weight
+                return None
+            evicted = None
+            floor = 0.0
+            if len(self.counts) >= self.capacity:
+                evicted = min(self.counts, key=self.counts.get)
+                floor = self.counts.pop(evicted)
+            self.counts[item] = floor + weight
+            return evicted
+
+    def top(self, k: int) -> List[Tuple[str, float]]:
+        with self._lock:
+            return sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+    def decay(self, factor: float = DECAY) -> None:
+        with self._lock:
+            self.counts = {item: count * factor for item, count in self.counts.items() if count * factor >= 0.01}
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.counts
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+
+def load_seed_subjects(path: str) -> List[str]:
+    """
+    Subjects from a seed file, one per line; blank lines and lines starting with # are ignored
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = [line.strip() for line in f]
+    except OSError as e:
+        logger.warning("Could not load warm seed file", extra={"path": path, "error": str(e)})
+        return []
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+class CacheWarmer:
+    """
+    Background task that keeps quotes and audio for popular subjects cached.
+
+    Subjects requested through the quote endpoints are counted in a Space-Saving
+    sketch. Every interval the top_k subjects are warmed: quotes are generated if
+    they are not freshly cached, then audio is synthesized for each quote in the
+    voices recently used with that subject (the default voice if none).
+
+    Warming never competes with live traffic: each upstream call needs a token
+    from the warmer's own bucket (calls_per_minute, up to burst), and calls are
+    only made while is_idle() says the upstreams have spare capacity. Seed
+    subjects are warmed as soon as the task starts.
+    """
+
+    def __init__(
+        self,
+        lookup: Callable[[str], Awaitable[Optional[Dict[str, Any]]]],
+        generate: Callable[[str], Awaitable[Dict[str, Any]]],
+        audio_cached: Callable[[str, str], Awaitable[bool]],
+        synthesize: Callable[[str, str], Awaitable[Any]],
+        is_idle: Callable[[], bool],
+        default_voice: str,
+        top_k: int = 20,
+        interval: float = 60.0,
+        sketch_size: int = 500,
+        calls_per_minute: float = 30.0,
+        burst: float = 60.0,
+        concurrency: int = 2,
+        seed_subjects: Iterable[str] = (),
+    ):
+        self.lookup = lookup
+        self.generate = generate
+        self.audio_cached = audio_cached
+        self.synthesize = synthesize
+        self.is_idle = is_idle
+        self.default_voice = default_voice
+        self.top_k = top_k
+        self.interval = interval
+        self.concurrency = concurrency
+        self.seed_subjects = list(seed_subjects)
+
+        self.sketch = SpaceSaving(sketch_size)
+        self.bucket = TokenBucket(rate=calls_per_minute / 60.0, burst=burst)
+        # Normalized subject -> (subject as last typed, recent voices)
+        self._subjects: Dict[str, Tuple[str, Deque[str]]] = {}
+
+        self.cycles = 0
+        self.quotes_warmed = 0
+        self.audio_warmed = 0
+        self.skipped_busy = 0
+        self.skipped_budget = 0
+        self.failures = 0
+
+    def record(self, subject: str, voice_id: Optional[str] = None) -> None:
+        """
+        Count one request for subject, remembering the voice it was heard in
+        """
+        key = normalize_subject(subject)
+        if not key:
+            return
+        evicted = self.sketch.add(key)
+        if evicted is not None:
+            self._subjects.pop(evicted, None)
+        voices = self._subjects.get(key, (subject, deque(maxlen=VOICES_PER_SUBJECT)))[1]
+        if voice_id:
+            if voice_id in voices:
+                voices.remove(voice_id)
+            voices.appendleft(voice_id)
+        self._subjects[key] = (subject, voices)
+
+    def trending(self) -> List[Tuple[str, List[str]]]:
+        """
+        The top_k subjects with the voices to warm for each
+        """
+        trending = []
+        for key, _ in self.sketch.top(self.top_k):
+            subject, voices = self._subjects.get(key, (key, ()))
+            trending.append((subject, list(voices) or [self.default_voice]))
+        return trending
+
+    async def run(self) -> None:
+        if self.seed_subjects:
+            for subject in self.seed_subjects:
+                self.record(subject)
+            await self.warm([(subject, [self.default_voice]) for subject in self.seed_subjects])
+            logger.info("Warmed seed subjects", extra=self.stats())
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.warm(self.trending())
+            self.decay()
+
+    def decay(self) -> None:
+        """
+        Age the subject counts and forget the voices of subjects no longer tracked
+        """
+        self.sketch.decay()
+        self._subjects = {key: entry for key, entry in self._subjects.items() if key in self.sketch}
+
+    async def warm(self, subjects: List[Tuple[str, List[str]]]) -> None:
+        """
+        Warm subjects in order of popularity, a few at a time
+        """
+        self.cycles += 1
+        pending = deque(subjects)
+
+        async def worker():
+            while pending:
+                subject, voices = pending.popleft()
+                try:
+                    if not await self._warm_subject(subject, voices):
+                        # Out of budget or upstreams are busy: stop this cycle
+                        pending.clear()
+                except Exception as e:
+                    self.failures += 1
+                    logger.warning("Cache warming failed", extra={"subject": subject, "error": str(e)})
+
+        await asyncio.gather(*(worker() for _ in range(max(1, self.concurrency))))
+
+    async def _warm_subject(self, subject: str, voices: List[str]) -> bool:
+        result = await self.lookup(subject)
+        if result is None:
+            if not self._may_call():
+                return False
+            WARMER_CALLS.inc(kind="quotes")
+            result = await self.generate(subject)
+            if result.get("is_fallback"):
+                # Gemini is unavailable; there is nothing worth voicing
+                return True
+            self.quotes_warmed += 1
+
+        for voice_id in voices:
+            for quote in result["quotes"]:
+                if await self.audio_cached(quote["quote"], voice_id):
+                    continue
+                if not self._may_call():
+                    return False
+                WARMER_CALLS.inc(kind="audio")
+                await self.synthesize(quote["quote"], voice_id)
+                self.audio_warmed += 1
+        return True
+
+    def _may_call(self) -> bool:
+        if not self.is_idle():
+            self.skipped_busy += 1
+            return False
+        if self.bucket.try_acquire() > 0:
+            self.skipped_budget += 1
+            return False
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "tracked_subjects": len(self.sketch),
+            "remembered_subjects": len(self._subjects),
+            "cycles": self.cycles,
+            "quotes_warmed": self.quotes_warmed,
+            "audio_warmed": self.audio_warmed,
+            "skipped_busy": self.skipped_busy,
+            "skipped_budget": self.skipped_budget,
+            "failures": self.failures,
+        }